@@ -21,3 +21,8 @@ recaptcha_private_key = os.getenv('RECAPTCHA_PRIVATE_KEY')
 recaptcha_public_key = os.getenv('RECAPTCHA_PUBLIC_KEY')
 
 prod_flag = os.getenv('PROD')
+
+# One of file(default), db, memcached, locmem, dummy or the dotted path to a cache backend
+cache_backend = os.getenv('CACHE_BACKEND', 'file')
+# directory for file, table for db and host:port for memcached based caches
+cache_location = os.getenv('CACHE_LOCATION')
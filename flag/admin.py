@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
 
 from flag.models import Flag, FlagInstance
 
@@ -11,10 +12,36 @@ class InlineFlagInstance(admin.TabularInline):
 
 class FlaggedContentAdmin(admin.ModelAdmin):
     list_display = ['content_object', 'creator', 'state', 'moderator', 'count']
+    list_filter = ['state']
+    list_select_related = ['creator', 'moderator']
     readonly_fields = ['content_object', 'creator', 'count']
     exclude = ['content_type', 'object_id']
-    search_fields = ['content_object']
+    # generic relations can't be searched, the creator of the content can
+    search_fields = ['creator__username']
     inlines = [InlineFlagInstance]
+    actions = ['approve', 'reject', 'resolve']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('content_object')
+
+    def _moderate(self, request, queryset, state):
+        updated = Flag.objects.moderate(list(queryset.values_list('id', flat=True)), state, request.user)
+        self.message_user(request, _('%(count)d flags have been marked as "%(state)s"') % {
+            'count': updated,
+            'state': Flag.State(state).label
+        })
+
+    def approve(self, request, queryset):
+        self._moderate(request, queryset, Flag.State.NOTIFIED)
+    approve.short_description = _('Approve the flags and notify the creators')
+
+    def reject(self, request, queryset):
+        self._moderate(request, queryset, Flag.State.REJECTED)
+    reject.short_description = _('Reject the flags')
+
+    def resolve(self, request, queryset):
+        self._moderate(request, queryset, Flag.State.RESOLVED)
+    resolve.short_description = _('Mark the content as modified or deleted')
 
 
 admin.site.register(Flag, FlaggedContentAdmin)
@@ -0,0 +1,62 @@
+"""Import moderation reports in bulk from a JSONL stream"""
+import json
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from flag.models import FlagInstance
+
+
+class Command(BaseCommand):
+    help = (
+        'Flag content in bulk from a JSONL file, one report per line with the keys '
+        'user(id), app, model, id, reason and info. Pass - to read from the standard input.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the JSONL file, - for the standard input')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of reports inserted at a time')
+
+    def read_batches(self, stream, batch_size):
+        """
+        Yields lists of `(line number, report)`, lines that aren't valid JSON are reported,
+        counted in `self.invalid` and skipped
+        """
+        lines = enumerate(stream, start=1)
+        while True:
+            batch, read = [], False
+            for number, line in islice(lines, batch_size):
+                read = True
+                if not line.strip():
+                    continue
+                try:
+                    batch.append((number, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    self.stderr.write(f'line {number}: {e}')
+                    self.invalid += 1
+            if not read:
+                return
+            if batch:
+                yield batch
+
+    def import_flags(self, stream, batch_size):
+        total_created = total_errors = 0
+        self.invalid = 0
+        for batch in self.read_batches(stream, batch_size):
+            numbers = [number for number, __ in batch]
+            created, errors = FlagInstance.objects.bulk_set_flags(
+                [report for __, report in batch], batch_size=batch_size)
+            for index, error in errors:
+                self.stderr.write(f'line {numbers[index]}: {error}')
+            total_created += created
+            total_errors += len(errors)
+        total_errors += self.invalid
+        self.stdout.write(f'Created {total_created} flags, {total_errors} reports were invalid')
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.import_flags(sys.stdin, options['batch_size'])
+        else:
+            with open(options['path']) as stream:
+                self.import_flags(stream, options['batch_size'])
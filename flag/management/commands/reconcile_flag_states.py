@@ -0,0 +1,55 @@
+"""Repair the state and the count of flags copied to the content that inherits FlagStateMixin"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from flag.models import Flag, FlagStateMixin
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the state and the count of the flags again to the content that has drifted from them, '
+        'in batches of ids. Content without a flag is reset to unflagged.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Number of ids repaired at a time')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the content that has drifted')
+
+    def get_drifted(self, model):
+        """
+        Returns
+            QuerySet: the objects of the model whose flag state or count differs from their flag's.
+        """
+        ctype = ContentType.objects.get_for_model(model)
+        flag = Flag.objects.filter(content_type=ctype, object_id=models.OuterRef('pk'))
+        return model._default_manager.annotate(
+            actual_state=Coalesce(models.Subquery(flag.values('state')[:1]), Flag.State.UNFLAGGED),
+            actual_count=Coalesce(models.Subquery(flag.values('count')[:1]), 0),
+        ).exclude(flag_state=models.F('actual_state'), flag_count=models.F('actual_count'))
+
+    def reconcile(self, model, batch_size, dry_run):
+        """Returns the number of objects of the model that were repaired, or would be on a dry run"""
+        drifted = self.get_drifted(model)
+        ids = model._default_manager.aggregate(first=models.Min('id'), last=models.Max('id'))
+        if ids['first'] is None:
+            return 0
+
+        repaired = 0
+        for start in range(ids['first'], ids['last'] + 1, batch_size):
+            batch = drifted.filter(id__gte=start, id__lt=start + batch_size)
+            if dry_run:
+                repaired += batch.count()
+            else:
+                repaired += batch.update(flag_state=models.F('actual_state'), flag_count=models.F('actual_count'))
+        return repaired
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not issubclass(model, FlagStateMixin):
+                continue
+            repaired = self.reconcile(model, options['batch_size'], options['dry_run'])
+            action = 'drifted' if options['dry_run'] else 'repaired'
+            self.stdout.write(f'{model._meta.label}: {repaired} objects {action}')
@@ -1,17 +1,133 @@
+from collections import defaultdict
+
 from django.apps import apps
-from django.core.exceptions import ValidationError
-from django.db import IntegrityError, models
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import IntegrityError, connections, models, transaction
 from django.utils.translation import gettext_lazy as _
 
-from ideas.utils import get_content_type, get_model_object
+from ideas.utils import get_content_type
 
 
 class FlagManager(models.Manager):
     def get_flag(self, model_obj):
         ctype = get_content_type(model_obj)
-        flag, __ = self.get_or_create(content_type=ctype, object_id=model_obj.id, creator=model_obj.user)
+        # flags are unique per object, the creator is only needed to create one
+        flag, __ = self.get_or_create(
+            content_type=ctype,
+            object_id=model_obj.id,
+            defaults={'creator_id': model_obj.user_id}
+        )
         return flag
 
+    def sync_flag_states(self, flags):
+        """
+        Copy the state and the count of flags to their content, when its model inherits `FlagStateMixin`.
+        The values are read from the database in the same `UPDATE`, one per model.
+
+        Args:
+            flags (iterable): flags, only their `content_type_id` and `object_id` are used.
+
+        Returns:
+            int: number of objects updated.
+        """
+        from flag.models import FlagStateMixin
+
+        object_ids = defaultdict(set)
+        for flag in flags:
+            object_ids[flag.content_type_id].add(flag.object_id)
+
+        updated = 0
+        for ctype_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(ctype_id).model_class()
+            if model is None or not issubclass(model, FlagStateMixin):
+                continue
+            flag = self.filter(content_type_id=ctype_id, object_id=models.OuterRef('pk'))
+            updated += model._default_manager.filter(id__in=ids).update(
+                flag_state=models.Subquery(flag.values('state')[:1]),
+                flag_count=models.Subquery(flag.values('count')[:1])
+            )
+        return updated
+
+    def update_count(self, flag_id, delta):
+        """
+        Change the count of a flag and toggle its state in a single `UPDATE`, the state follows
+        the same rules as `Flag.toggle_state` does with the new count. It runs within the transaction
+        of `create_flag` or `delete_flag` through the signals of `FlagInstance`.
+
+        Args:
+            flag_id (int): the id of the flag.
+            delta (int): 1 when flagged, -1 when unflagged.
+
+        Returns:
+            int: number of flags updated.
+        """
+        allowed_flags = getattr(settings, 'FLAGS_ALLOWED', 0)
+        State = self.model.State
+        # `state` is set before `count` and is compared against the old count since MySQL
+        # evaluates the assignments from left to right, unlike the other backends.
+        return self.filter(id=flag_id).update(
+            state=models.Case(
+                models.When(count__gt=allowed_flags - delta, state=State.UNFLAGGED, then=State.FLAGGED),
+                default=State.UNFLAGGED,
+                output_field=models.SmallIntegerField()
+            ),
+            count=models.F('count') + delta
+        )
+
+    def recount(self, flag_ids):
+        """
+        Recompute the count of flags from their instances in a single `UPDATE`, used after inserting
+        instances in bulk. Unlike `update_count`, the state doesn't alternate, unflagged content
+        becomes flagged over `FLAGS_ALLOWED` and flagged content becomes unflagged within it.
+        States set by moderators are kept.
+
+        Args:
+            flag_ids (iterable): ids of the flags.
+
+        Returns:
+            int: number of flags updated.
+        """
+        allowed_flags = getattr(settings, 'FLAGS_ALLOWED', 0)
+        State = self.model.State
+        FlagInstance = apps.get_model('flag', 'FlagInstance')
+        new_count = (
+            FlagInstance.objects.filter(flag=models.OuterRef('pk')).order_by()
+            .values('flag').annotate(total=models.Count('id')).values('total')
+        )
+        return self.filter(id__in=flag_ids).annotate(
+            new_count=models.functions.Coalesce(models.Subquery(new_count), 0)
+        ).update(
+            state=models.Case(
+                models.When(new_count__gt=allowed_flags, state=State.UNFLAGGED, then=State.FLAGGED),
+                models.When(new_count__lte=allowed_flags, state=State.FLAGGED, then=State.UNFLAGGED),
+                default=models.F('state'),
+                output_field=models.SmallIntegerField()
+            ),
+            count=models.F('new_count')
+        )
+
+    def moderate(self, flag_ids, state, moderator):
+        """
+        Set the state and the moderator of flags in a single `UPDATE`
+
+        Args:
+            flag_ids (iterable): ids of the flags, or a queryset of them.
+            state (int): one of the states set by moderators, `REJECTED`, `NOTIFIED` or `RESOLVED`.
+            moderator (object): the user moderating the flags.
+
+        Returns:
+            int: number of flags updated.
+        """
+        State = self.model.State
+        if state not in [State.REJECTED, State.NOTIFIED, State.RESOLVED]:
+            raise ValueError(f'{state} is not a state that can be set by moderators')
+        updated = self.filter(id__in=flag_ids).update(state=state, moderator=moderator)
+        self.sync_flag_states(self.filter(id__in=flag_ids).only('content_type_id', 'object_id'))
+        return updated
+
 
 class FlagInstanceManager(models.Manager):
     def has_flagged(self, user, model_obj):
@@ -28,6 +144,27 @@ class FlagInstanceManager(models.Manager):
         ctype = get_content_type(model_obj)
         return self.filter(flag__content_type=ctype, flag__object_id=model_obj.id, user=user).exists()
 
+    def flagged_ids(self, user, objects):
+        """
+        Returns the ids of the objects that have been flagged by a user, in a single query
+
+        Args:
+            user (object): the user to be inquired about.
+            objects (iterable): model objects of the same model, e.g. a queryset or a page of it.
+
+        Returns:
+            set
+        """
+        objects = list(objects)
+        if not objects or not user.is_authenticated:
+            return set()
+        ids = [obj.id for obj in objects]
+        ctype = get_content_type(objects[0])
+        return set(
+            self.filter(flag__content_type=ctype, flag__object_id__in=ids, user=user)
+            .values_list('flag__object_id', flat=True)
+        )
+
     def _clean_reason(self, reason):
         err = ValidationError(
                 _('%(reason)s is an invalid reason'),
@@ -60,7 +197,9 @@ class FlagInstanceManager(models.Manager):
     def create_flag(self, user, flag, reason, info):
         cleaned_reason, cleaned_info = self._clean(reason, info)
         try:
-            self.create(flag=flag, user=user, reason=cleaned_reason, info=cleaned_info)
+            # the count of the flag is updated along with the instance, see flag.models.flagged
+            with transaction.atomic():
+                self.create(flag=flag, user=user, reason=cleaned_reason, info=cleaned_info)
         except IntegrityError:
             raise ValidationError(
                     _('This content has already been flagged by the user (%(user)s)'),
@@ -69,31 +208,176 @@ class FlagInstanceManager(models.Manager):
                 )
 
     def delete_flag(self, user, flag):
+        Flag = apps.get_model('flag', 'Flag')
+        with transaction.atomic():
+            # deleted without being fetched first, hence without post_delete and the count is updated
+            # here instead of by flag.models.unflagged
+            if not self.filter(user=user, flag=flag)._raw_delete(self.db):
+                raise ValidationError(
+                    _('This content has not been flagged by the user (%(user)s)'),
+                    params={'user': user},
+                    code='invalid'
+                )
+            Flag.objects.update_count(flag.id, -1)
+            Flag.objects.sync_flag_states([flag])
+
+    @staticmethod
+    def _is_flaggable(model):
+        """Returns bool: whether the content of the model has a creator, the `user` whose content is flagged"""
         try:
-            self.get(user=user, flag=flag).delete()
-        except self.model.DoesNotExist:
-            raise ValidationError(
-                _('This content has not been flagged by the user (%(user)s)'),
-                params={'user': user},
-                code='invalid'
-            )
+            field = model._meta.get_field('user')
+        except FieldDoesNotExist:
+            return False
+        return field.many_to_one and field.related_model == get_user_model()
 
-    def set_flag(self, user, flag, **kwargs):
-        model_obj = get_model_object(
-            app_name=kwargs['app_name'],
-            model_name=kwargs['model_name'],
-            model_id=kwargs['model_id']
-        )
+    def _get_object_id_range(self):
+        """Returns tuple: the smallest and the largest ids of the objects that a flag can store"""
+        field = apps.get_model('flag', 'Flag')._meta.get_field('object_id')
+        min_id, max_id = connections[self.db].ops.integer_field_range(field.get_internal_type())
+        # the backends which don't enforce it(e.g. sqlite) still store 64 bit integers
+        return max(min_id or 0, 0), max_id if max_id is not None else 2 ** 63 - 1
+
+    def _clean_reports(self, reports):
+        """
+        Validate a batch of reports with the same rules as `create_flag`, the models are resolved
+        once per `(app, model)` pair and the objects and users once per batch.
+
+        Returns:
+            tuple: list of `(index, model, object_id, user_id, reason, info)` of the valid reports,
+                the creators of the objects by their model and ids and a list of `(index, error)`
+                of the invalid reports.
+        """
+        cleaned, errors, resolved_models = [], [], {}
+        min_id, max_id = self._get_object_id_range()
+        for index, report in reports:
+            # any JSON value is read from a line, e.g. `[1, 2]`
+            if not isinstance(report, dict):
+                errors.append((index, _('a report must be an object, %(report)s is not') % {'report': report}))
+                continue
+            key = (report.get('app'), report.get('model'))
+            if key not in resolved_models:
+                try:
+                    resolved_models[key] = apps.get_model(*key)
+                except (LookupError, ValueError, TypeError):
+                    resolved_models[key] = None
+            try:
+                reason, info = self._clean(report.get('reason'), report.get('info'))
+                if resolved_models[key] is None:
+                    raise ValidationError(
+                        _('%(model)s is not a valid model'), params={'model': '.'.join(map(str, key))})
+                if not self._is_flaggable(resolved_models[key]):
+                    raise ValidationError(
+                        _('%(model)s can not be flagged'), params={'model': '.'.join(map(str, key))})
+                try:
+                    object_id = int(report.get('id'))
+                except (ValueError, TypeError):
+                    raise ValidationError(
+                        _('model id must be an integer, %(id)s is not'), params={'id': report.get('id')})
+                if not min_id <= object_id <= max_id:
+                    raise ValidationError(
+                        _('model id must be between %(min)s and %(max)s, %(id)s is not'),
+                        params={'min': min_id, 'max': max_id, 'id': object_id})
+            except ValidationError as e:
+                errors.append((index, e.messages[0]))
+            else:
+                cleaned.append((index, resolved_models[key], object_id, report.get('user'), reason, info))
+
+        ids = defaultdict(set)
+        for report in cleaned:
+            ids[report[1]].add(report[2])
+        # the creator of the content by the model and the id of the objects that exist
+        existing = defaultdict(dict)
+        for model, model_ids in ids.items():
+            existing[model].update(model._default_manager.filter(id__in=model_ids).values_list('id', 'user_id'))
+        user_ids = set(get_user_model().objects.filter(
+            id__in={report[3] for report in cleaned if isinstance(report[3], int)}
+        ).values_list('id', flat=True))
+
+        valid = []
+        for report in cleaned:
+            index, model, object_id, user_id = report[:4]
+            if object_id not in existing[model]:
+                errors.append((index, f'{object_id} is not a valid model id for the model {model.__name__}'))
+            elif user_id not in user_ids:
+                errors.append((index, f'{user_id} is not a valid user'))
+            else:
+                valid.append(report)
+        return valid, existing, errors
+
+    def bulk_set_flags(self, reports, batch_size=1000):
+        """
+        Flag content in bulk, e.g. reports imported from a moderation pipeline.
+
+        A batch costs a constant number of queries, instead of the queries per instance made by
+        `create_flag` and its signals. The instances are inserted without firing any signal,
+        the reports already flagged by the users are ignored and the count and state of the flags
+        are recomputed with `FlagManager.recount`.
+
+        Args:
+            reports (iterable): dicts with the keys `user`(id), `app`, `model`, `id`, `reason` and `info`.
+            batch_size (int): number of reports inserted at a time.
+
+        Returns:
+            tuple: number of instances created and a list of `(index, error)` of the invalid reports.
+        """
         Flag = apps.get_model('flag', 'Flag')
-        flag_obj = Flag.objects.get_flag(model_obj)
+        created, errors = 0, []
+        reports = list(reports)
+        for start in range(0, len(reports), batch_size):
+            valid, existing, batch_errors = self._clean_reports(
+                enumerate(reports[start:start + batch_size], start=start))
+            errors += batch_errors
+            if not valid:
+                continue
+
+            ctypes = {model: ContentType.objects.get_for_model(model) for model in existing}
+            with transaction.atomic():
+                Flag.objects.bulk_create([
+                    Flag(content_type=ctypes[model], object_id=object_id, creator_id=creator_id)
+                    for model, creators in existing.items()
+                    for object_id, creator_id in creators.items()
+                ], ignore_conflicts=True)
+                flag_ids = {}
+                for model, creators in existing.items():
+                    flags = Flag.objects.filter(content_type=ctypes[model], object_id__in=creators)
+                    flag_ids.update({
+                        (model, object_id): flag_id for object_id, flag_id in flags.values_list('object_id', 'id')
+                    })
+
+                instances = [
+                    self.model(flag_id=flag_ids[(model, object_id)], user_id=user_id, reason=reason, info=info)
+                    for __, model, object_id, user_id, reason, info in valid
+                ]
+                touched = {instance.flag_id for instance in instances}
+                before = self.filter(flag_id__in=touched).count()
+                self.bulk_create(instances, ignore_conflicts=True)
+                created += self.filter(flag_id__in=touched).count() - before
+                Flag.objects.recount(touched)
+                Flag.objects.sync_flag_states(
+                    Flag(content_type=ctypes[model], object_id=object_id) for model, object_id in flag_ids)
+
+        errors.sort()
+        return created, errors
+
+    def set_flag(self, user, flag, **kwargs):
+        """
+        Flag the content when a reason is passed, unflag it otherwise.
+
+        Args:
+            user (object): the user flagging the content.
+            flag (Flag): the flag of the content, see `FlagManager.get_flag`.
+
+        Returns:
+            bool: whether the content has been flagged.
+        """
         info = kwargs.get('info', None)
         reason = kwargs.get('reason', None)
 
         if reason:
-            self.create_flag(user, flag_obj, reason, info)
+            self.create_flag(user, flag, reason, info)
             created = True
         else:
-            self.delete_flag(user, flag_obj)
+            self.delete_flag(user, flag)
             created = False
 
         return created
@@ -0,0 +1,17 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flag', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flag',
+            index=models.Index(fields=['state', '-count', '-id'], name='flag_state_count_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 import json
 
-from django.contrib.contenttypes.models import ContentType
+from django.apps import apps
 
 from flag.exceptions import FlagBadRequest
 
@@ -26,24 +26,29 @@ class ContentTypeMixin:
         if not model_id:
             return FlagBadRequest('model id is required')
 
-        if not ContentType.objects.filter(app_label=app_name).exists():
+        try:
+            app_config = apps.get_app_config(app_name)
+        except LookupError:
             return FlagBadRequest(f'{app_name} is not a valid app name')
 
         try:
-            ctype = ContentType.objects.get(model=model_name.lower()).model_class()
-            model_class = ctype.objects.filter(id=model_id)
-            if not model_class.exists() and model_class.count() != 1:
-                return FlagBadRequest(f'{model_id} is not a valid model id for the model {model_name}')
-
-        except ContentType.DoesNotExist:
+            # the registry is in memory, so no query is made to validate the names
+            model_class = app_config.get_model(model_name)
+        except LookupError:
             return FlagBadRequest(f'{model_name} is not a valid model name')
 
+        try:
+            model_obj = model_class._default_manager.get(id=model_id)
+        except model_class.DoesNotExist:
+            return FlagBadRequest(f'{model_id} is not a valid model id for the model {model_name}')
         except ValueError:
             return FlagBadRequest(f'model id must be an integer, {model_id} is not')
 
         self.app_name = app_name
         self.model_name = model_name
         self.mode_id = model_id
+        # the target is resolved once per request and passed around from here on
+        self.model_obj = model_obj
         self.data = data
         return super().dispatch(request, *args, **kwargs)
 
@@ -38,6 +38,10 @@ class Flag(models.Model):
     class Meta:
         verbose_name = _('Flag')
         unique_together = ['content_type', 'object_id']
+        indexes = [
+            # the moderation queue lists the flags of a state, the most flagged first
+            models.Index(fields=['state', '-count', '-id'], name='flag_state_count_idx'),
+        ]
 
     def increase_count(self):
         field = 'count'
@@ -62,6 +66,24 @@ class Flag(models.Model):
         self.save(update_fields=[field])
 
 
+class FlagStateMixin(models.Model):
+    """
+    Opt-in copy of the state and the count of the flag on the flagged model, so that content
+    can be filtered by them without joining through the generic relation to `Flag`.
+
+    Kept in sync by `FlagManager.sync_flag_states`, drift is repaired by the command reconcile_flag_states.
+    """
+    # states in which the content is hidden
+    HIDDEN_FLAG_STATES = [Flag.State.FLAGGED, Flag.State.NOTIFIED]
+
+    flag_state = models.SmallIntegerField(
+        choices=Flag.State.choices, default=Flag.State.UNFLAGGED, db_index=True, editable=False)
+    flag_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+
 class FlagInstance(models.Model):
     REASON = getattr(settings, "FLAG_REASONS", [
         (1, _("Spam | Exists only to promote a service ")),
@@ -112,13 +134,14 @@ class FlagInstance(models.Model):
 
 @receiver(post_save, sender=FlagInstance)
 def flagged(sender, instance, created, raw, using, update_fields, **kwargs):
+    """Increase flag count and toggle its state in the flag model after creating an instance"""
     if created:
-        instance.flag.increase_count()
-        instance.flag.toggle_state()
+        Flag.objects.update_count(instance.flag_id, 1)
+        Flag.objects.sync_flag_states([instance.flag])
 
 
 @receiver(post_delete, sender=FlagInstance)
 def unflagged(sender, instance, using, **kwargs):
     """Decrease flag count in the flag model before deleting an instance"""
-    instance.flag.decrease_count()
-    instance.flag.toggle_state()
+    Flag.objects.update_count(instance.flag_id, -1)
+    Flag.objects.sync_flag_states([instance.flag])
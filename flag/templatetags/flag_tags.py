@@ -20,19 +20,30 @@ def has_flagged(user, obj):
     return False
 
 
+@register.simple_tag
+def prime_flag_states(objects, user):
+    """
+    A template tag used for finding the objects flagged by the user on a page in a single query
+
+    Usage: `{% prime_flag_states ideas user as flagged %}`, then pass `flagged` to `render_flag_form`
+    """
+    return FlagInstance.objects.flagged_ids(user, objects)
+
+
 @register.inclusion_tag('flag/flag_form.html')
-def render_flag_form(obj, user):
+def render_flag_form(obj, user, flagged=None):
     """
     A template tag used for adding flag form in templates
 
     To render the flag form for a idea model inside the app ideas'
 
     Usage: `{% render_flag_form for idea user %}`
+    Usage on lists: `{% render_flag_form idea user flagged %}`, with flagged from `prime_flag_states`
     """
     return {
         'app_name': get_app_name(obj),
         'model_name': get_model_name(obj),
         'model_id': obj.id,
-        'has_flagged': has_flagged(user, obj),
+        'has_flagged': has_flagged(user, obj) if flagged is None else obj.id in flagged,
         'flag_reasons': FlagInstance.reasons
     }
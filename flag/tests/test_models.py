@@ -1,6 +1,12 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 
-from flag.tests.base import BaseFlagModelTest, Flag, FlagInstance
+from flag.tests.base import BaseFlagModelTest, Flag, FlagInstance, Idea
 
 
 class FlagModelTest(BaseFlagModelTest):
@@ -46,6 +52,23 @@ class FlagManagerTest(BaseFlagModelTest):
     def test_get_flag(self):
         self.assertEqual(Flag.objects.get_flag(self.idea_2), self.flag)
 
+    def test_update_count(self):
+        """Test the count and the state change as with `increase_count`, `decrease_count` and `toggle_state`"""
+        expected = Flag.objects.get_flag(self.idea_1)
+        for allowed_flags in [0, 1, 2]:
+            with self.settings(FLAGS_ALLOWED=allowed_flags):
+                for delta in [1, 1, 1, -1, 1, -1, -1, -1]:
+                    with self.assertNumQueries(1):
+                        Flag.objects.update_count(self.flag.id, delta)
+                    if delta > 0:
+                        expected.increase_count()
+                    else:
+                        expected.decrease_count()
+                    expected.toggle_state()
+                    self.flag.refresh_from_db()
+
+                    self.assertEqual((self.flag.count, self.flag.state), (expected.count, expected.state))
+
 
 class FlagInstanceModelTest(BaseFlagModelTest):
     def test_create_flag_instance(self):
@@ -152,3 +175,121 @@ class TestFlagInstanceManager(BaseFlagModelTest):
             FlagInstance.objects.delete_flag(user, flag)
 
         self.assertEqual(error.exception.messages, [f'This content has not been flagged by the user ({user})'])
+
+
+class TestBulkSetFlags(BaseFlagModelTest):
+    def get_report(self, idea=None, user=None, **kwargs):
+        report = {
+            'user': user if isinstance(user, int) else (user or self.user_2).id,
+            'app': 'ideas',
+            'model': 'idea',
+            'id': (idea or self.idea_1).id,
+            'reason': FlagInstance.reason_values[0],
+            'info': None
+        }
+        report.update(kwargs)
+        return report
+
+    def test_bulk_set_flags(self):
+        self.set_flag(self.idea_1, self.user_1)
+        reports = [
+            self.get_report(),
+            self.get_report(self.idea_2),
+            self.get_report(self.idea_2, self.user_1),
+            # already flagged by the user
+            self.get_report(self.idea_1, self.user_1),
+            self.get_report(reason=-1),
+            self.get_report(reason=FlagInstance.reason_values[-1]),
+            self.get_report(model='nothing'),
+            self.get_report(id=1000),
+            self.get_report(id='a'),
+            self.get_report(user=1000),
+            # models without a creator
+            self.get_report(app='auth', model='user', id=self.user_1.id),
+            self.get_report(app='taggit', model='tag', id=1),
+            self.get_report(id=2 ** 70),
+            self.get_report(id=-1),
+        ]
+        created, errors = FlagInstance.objects.bulk_set_flags(reports, batch_size=4)
+
+        self.assertEqual(created, 3)
+        self.assertEqual([index for index, __ in errors], [4, 5, 6, 7, 8, 9, 10, 11, 12, 13])
+        self.assertEqual(errors[0][1], '-1 is an invalid reason')
+        self.assertEqual(errors[6][1], 'auth.user can not be flagged')
+        self.assertIn(f'{2 ** 70} is not', errors[8][1])
+        flag_1, flag_2 = Flag.objects.get_flag(self.idea_1), Flag.objects.get_flag(self.idea_2)
+        self.assertEqual((flag_1.count, flag_1.state), (2, Flag.State.FLAGGED))
+        self.assertEqual((flag_2.count, flag_2.state), (2, Flag.State.FLAGGED))
+        self.assertEqual(flag_2.creator, self.idea_2.user)
+
+        with self.settings(FLAGS_ALLOWED=2):
+            FlagInstance.objects.bulk_set_flags([self.get_report(self.idea_2)])
+            flag_2.refresh_from_db()
+            self.assertEqual((flag_2.count, flag_2.state), (2, Flag.State.UNFLAGGED))
+
+    def test_bulk_set_flags_num_queries(self):
+        reports = [self.get_report(self.create_idea()) for __ in range(10)]
+        # objects, users, flags inserted and fetched, instances counted, inserted, counted, flags recounted
+        # and copied to the ideas within a savepoint
+        with self.assertNumQueries(11):
+            created, errors = FlagInstance.objects.bulk_set_flags(reports)
+        self.assertEqual((created, errors), (10, []))
+
+    def test_import_flags_command(self):
+        out, err = StringIO(), StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'flags.jsonl')
+            with open(path, 'w') as f:
+                f.write(json.dumps(self.get_report()) + '\n\nnot json\n' + json.dumps(self.get_report(reason=-1)))
+                f.write('\n[1, 2]\n"x"\n')
+            call_command('import_flags', path, stdout=out, stderr=err)
+
+        self.assertEqual('Created 1 flags, 4 reports were invalid' in out.getvalue(), True)
+        self.assertEqual('line 3:' in err.getvalue(), True)
+        self.assertEqual('line 4: -1 is an invalid reason' in err.getvalue(), True)
+        self.assertEqual('line 5: a report must be an object, [1, 2] is not' in err.getvalue(), True)
+        self.assertEqual('line 6: a report must be an object, x is not' in err.getvalue(), True)
+
+
+class TestFlagStateMixin(BaseFlagModelTest):
+    def assertFlagState(self, idea, state, count):
+        idea.refresh_from_db()
+        self.assertEqual((idea.flag_state, idea.flag_count), (state, count))
+
+    def test_flag_state_is_synced(self):
+        idea = self.idea_2
+        self.set_flag(idea, self.user_1)
+        self.assertFlagState(idea, Flag.State.FLAGGED, 1)
+
+        FlagInstance.objects.delete_flag(self.user_1, Flag.objects.get_flag(idea))
+        self.assertFlagState(idea, Flag.State.UNFLAGGED, 0)
+
+        FlagInstance.objects.bulk_set_flags([{
+            'user': self.user_2.id, 'app': 'ideas', 'model': 'idea', 'id': idea.id, 'reason': 1, 'info': None
+        }])
+        self.assertFlagState(idea, Flag.State.FLAGGED, 1)
+
+        Flag.objects.moderate([Flag.objects.get_flag(idea).id], Flag.State.NOTIFIED, self.user_1)
+        self.assertFlagState(idea, Flag.State.NOTIFIED, 1)
+
+    def test_hide_flagged_content(self):
+        self.set_flag(self.idea_2, self.user_1)
+        self.assertEqual(Idea.public_objects.filter(id=self.idea_2.id).exists(), True)
+        with self.settings(HIDE_FLAGGED_CONTENT=True):
+            self.assertEqual(list(Idea.public_objects.filter(id__in=[self.idea_1.id, self.idea_2.id])), [self.idea_1])
+
+    def test_reconcile_flag_states_command(self):
+        self.set_flag(self.idea_2, self.user_1)
+        Idea.objects.filter(id=self.idea_2.id).update(flag_state=Flag.State.UNFLAGGED, flag_count=0)
+        Idea.objects.filter(id=self.idea_1.id).update(flag_state=Flag.State.FLAGGED, flag_count=5)
+        Flag.objects.filter(content_type__model='idea', object_id=self.idea_1.id).delete()
+
+        out = StringIO()
+        call_command('reconcile_flag_states', '--dry-run', stdout=out)
+        self.assertEqual('ideas.Idea: 2 objects drifted' in out.getvalue(), True)
+        self.assertFlagState(self.idea_2, Flag.State.UNFLAGGED, 0)
+
+        call_command('reconcile_flag_states', '--batch-size', '1', stdout=out)
+        self.assertEqual('ideas.Idea: 2 objects repaired' in out.getvalue(), True)
+        self.assertFlagState(self.idea_2, Flag.State.FLAGGED, 1)
+        self.assertFlagState(self.idea_1, Flag.State.UNFLAGGED, 0)
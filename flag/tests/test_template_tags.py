@@ -1,5 +1,8 @@
-from flag.templatetags.flag_tags import get_app_name, get_model_name, has_flagged, render_flag_form
-from flag.tests.base import BaseTemplateTagsTest, FlagInstance
+from django.template import Context, Template
+
+from flag.templatetags.flag_tags import (
+    get_app_name, get_model_name, has_flagged, prime_flag_states, render_flag_form)
+from flag.tests.base import BaseTemplateTagsTest, FlagInstance, Idea
 
 
 class TestFlagTemplateTest(BaseTemplateTagsTest):
@@ -41,3 +44,30 @@ class TestFlagTemplateTest(BaseTemplateTagsTest):
         self.assertEqual(data['model_id'], idea.id)
         self.assertEqual(data['flag_reasons'], FlagInstance.reasons)
         self.assertEqual(data['has_flagged'], True)
+
+    def test_prime_flag_states(self):
+        user = self.user_2
+        self.set_flag(self.idea_2, user)
+        ideas = Idea.objects.all()
+
+        with self.assertNumQueries(2):
+            flagged = prime_flag_states(ideas, user)
+        self.assertEqual(flagged, {self.idea_2.id})
+        self.assertEqual(prime_flag_states(ideas, self.MockUser()), set())
+        self.assertEqual(prime_flag_states([], user), set())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(render_flag_form(self.idea_1, user, flagged)['has_flagged'], False)
+            self.assertEqual(render_flag_form(self.idea_2, user, flagged)['has_flagged'], True)
+
+    def test_prime_flag_states_in_template(self):
+        user = self.user_2
+        self.set_flag(self.idea_1, user)
+        template = Template(
+            '{% load flag_tags %}{% prime_flag_states ideas user as flagged %}'
+            '{% for idea in ideas %}{% render_flag_form idea user flagged %}{% endfor %}'
+        )
+        ideas = list(Idea.objects.all())
+
+        with self.assertNumQueries(1):
+            template.render(Context({'ideas': ideas, 'user': user}))
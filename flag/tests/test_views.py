@@ -1,6 +1,10 @@
+from unittest.mock import patch
+
 from django.conf import settings
+from django.shortcuts import reverse
 
-from flag.tests.base import BaseFlagViewTest, Flag, FlagInstance
+from flag.tests.base import BaseFlagTest, BaseFlagViewTest, Flag, FlagInstance
+from flag.views import FlagQueue
 
 
 class TestSetFlag(BaseFlagViewTest):
@@ -26,6 +30,26 @@ class TestSetFlag(BaseFlagViewTest):
                 )
         self.assertEqual(created, False)
 
+    def test_set_flag_num_queries(self):
+        """Test the object and the flag are fetched once, with the content type being cached"""
+        idea = self.create_idea()
+        flag = Flag.objects.get_flag(idea)
+        data = self.data.copy()
+        data['model_id'] = idea.id
+        # the action: within a savepoint the instance is inserted or deleted, counted and copied to the idea
+        with self.assertNumQueries(3 + 2):
+            FlagInstance.objects.set_flag(self.user_1, flag, reason=data['reason'])
+        with self.assertNumQueries(3 + 2):
+            FlagInstance.objects.set_flag(self.user_1, flag)
+
+        self.request('post', self.url, data=data)
+        data.pop('reason')
+        # along with resolving the user, the object and its flag
+        with self.assertNumQueries(3 + 3 + 2):
+            response = self.request('post', self.url, data=data)
+        self.assertEqual(response.json()['status'], 0)
+        self.assertEqual(Flag.objects.get(id=flag.id).count, 0)
+
     def test_set_flag_for_flagging_flagged_object(self):
         idea = self.create_idea()
         data = self.data.copy()
@@ -131,3 +155,62 @@ class TestSetFlag(BaseFlagViewTest):
         # check database
         flag = Flag.objects.get_flag(idea)
         self.assertEqual(FlagInstance.objects.get(user=response.wsgi_request.user, flag=flag).info, info)
+
+
+class TestFlagQueue(BaseFlagTest):
+    def setUp(self):
+        super().setUp()
+        self.user_1.is_staff = True
+        self.user_1.save()
+        self.flags = []
+        for __ in range(5):
+            flag = Flag.objects.get_flag(self.create_idea())
+            self.flags.append(flag)
+        for count, flag in enumerate(self.flags, start=1):
+            Flag.objects.filter(id=flag.id).update(count=count, state=Flag.State.FLAGGED)
+        self.url = reverse('flag:queue')
+
+    def test_queue_for_non_staff(self):
+        self.client.force_login(self.user_2)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_queue_ordering_and_paging(self):
+        """Test the most flagged content is listed first, fetching the content objects in one query"""
+        with patch.object(FlagQueue, 'paginate_by', 3):
+            # user, flags with their creators and moderators, content objects
+            with self.assertNumQueries(3):
+                response = self.client.get(self.url)
+            flags = response.context['flags']
+            self.assertEqual([flag.id for flag in flags], [flag.id for flag in self.flags[:1:-1]])
+            self.assertEqual(flags[0].content_object, self.flags[-1].content_object)
+
+            response = self.client.get(self.url, data={'cursor': response.context['page_obj'].next_cursor})
+            self.assertEqual([flag.id for flag in response.context['flags']], [self.flags[1].id, self.flags[0].id])
+
+        response = self.client.get(reverse('flag:queue-state', args=[Flag.State.REJECTED]))
+        self.assertEqual(len(response.context['flags']), 0)
+        response = self.client.get(reverse('flag:queue-state', args=[100]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_moderate_flags(self):
+        flag_ids = [flag.id for flag in self.flags[:3]]
+        # user, a single update of the flags and their states copied to the ideas
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url, data={'action': 'reject', 'flag_ids': flag_ids})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, self.url)
+        self.assertEqual(
+            set(Flag.objects.filter(state=Flag.State.REJECTED).values_list('id', 'moderator')),
+            {(flag_id, self.user_1.id) for flag_id in flag_ids}
+        )
+
+        for action, state in [('approve', Flag.State.NOTIFIED), ('resolve', Flag.State.RESOLVED)]:
+            self.client.post(self.url, data={'action': action, 'flag_ids': flag_ids[:1]})
+            self.assertEqual(Flag.objects.get(id=flag_ids[0]).state, state)
+
+        response = self.client.post(self.url, data={'action': 'delete', 'flag_ids': flag_ids})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, data={'action': 'reject', 'flag_ids': ['a']})
+        self.assertEqual(response.status_code, 400)
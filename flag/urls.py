@@ -1,9 +1,11 @@
 from django.urls import path
 
-from flag.views import SetFlag
+from flag.views import FlagQueue, SetFlag
 
 app_name = 'flag'
 
 urlpatterns = [
     path('', SetFlag.as_view(), name='flag'),
+    path('queue/', FlagQueue.as_view(), name='queue'),
+    path('queue/<int:state>/', FlagQueue.as_view(), name='queue-state'),
 ]
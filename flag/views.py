@@ -1,23 +1,22 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import ValidationError
-from django.http.response import JsonResponse
+from django.http import Http404
+from django.http.response import HttpResponseBadRequest, JsonResponse
+from django.shortcuts import redirect
 from django.utils.translation import gettext_lazy as _
 from django.views import View
+from django.views.generic import ListView
 
 from flag.mixins import ContentTypeMixin, RequestMixin
 from flag.models import Flag, FlagInstance
-from ideas.utils import get_model_object
+from utils.pagination import KeysetPaginationMixin
 
 
 class SetFlag(LoginRequiredMixin, RequestMixin, ContentTypeMixin, View):
     def post(self, request, *args, **kwargs):
         response = {'status': 1}
-        model_obj = get_model_object(
-            app_name=self.app_name,
-            model_name=self.model_name,
-            model_id=self.mode_id
-        )
-        flag = Flag.objects.get_flag(model_obj)
+        flag = Flag.objects.get_flag(self.model_obj)
 
         try:
             if FlagInstance.objects.set_flag(request.user, flag, **self.data):
@@ -38,3 +37,61 @@ class SetFlag(LoginRequiredMixin, RequestMixin, ContentTypeMixin, View):
             })
 
         return JsonResponse(response)
+
+
+class FlagQueue(LoginRequiredMixin, UserPassesTestMixin, KeysetPaginationMixin, ListView):
+    """
+    Lists the flags in a state for the staff to moderate, the most flagged first.
+    Flags selected on a page are approved, rejected or resolved through POST requests.
+    """
+    model = Flag
+    template_name = 'flag/flag_queue.html'
+    context_object_name = 'flags'
+    paginate_by = 50
+    keyset_pagination = True
+    keyset_ordering = ('-count', '-id')
+    actions = {
+        'approve': Flag.State.NOTIFIED,
+        'reject': Flag.State.REJECTED,
+        'resolve': Flag.State.RESOLVED,
+    }
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_state(self):
+        state = self.kwargs.get('state', Flag.State.FLAGGED)
+        if state not in Flag.State.values:
+            raise Http404(_('%(state)s is not a valid state') % {'state': state})
+        return state
+
+    def get_queryset(self):
+        # the content objects are fetched in a query per content type
+        return (
+            Flag.objects.filter(state=self.get_state())
+            .select_related('creator', 'moderator')
+            .prefetch_related('content_object')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['state'] = self.get_state()
+        context['states'] = Flag.State.choices
+        return context
+
+    def post(self, request, *args, **kwargs):
+        self.get_state()
+        state = self.actions.get(request.POST.get('action'))
+        if state is None:
+            return HttpResponseBadRequest(_('Bad Request! invalid action'))
+        try:
+            flag_ids = [int(flag_id) for flag_id in request.POST.getlist('flag_ids')]
+        except ValueError:
+            return HttpResponseBadRequest(_('Bad Request! invalid flags'))
+
+        updated = Flag.objects.moderate(flag_ids, state, request.user)
+        messages.success(request, _('%(count)d flags have been marked as "%(state)s"') % {
+            'count': updated,
+            'state': Flag.State(state).label
+        })
+        return redirect(request.get_full_path())
@@ -2,8 +2,8 @@ import os
 import sys
 
 from config.config import (
-    email_host_pass, email_host_user, project_name, recaptcha_private_key,
-    recaptcha_public_key)
+    cache_backend, cache_location, email_host_pass, email_host_user, project_name,
+    recaptcha_private_key, recaptcha_public_key)
 
 # Just a hack to find wayaround relative imports
 sys.path.append('...')
@@ -139,3 +139,136 @@ RECAPTCHA_PUBLIC_KEY = recaptcha_public_key
 RECAPTCHA_DEFAULT_ACTION = 'generic'
 RECAPTCHA_SCORE_THRESHOLD = 0.5
 ##############################################################################
+
+# Pagination ############################
+# Use cursor based pagination for the idea listings instead of page numbers.
+# Deep pages cost the same as the first one and no COUNT(*) query is made.
+KEYSET_PAGINATION = False
+##############################################################################
+
+# Caching ############################
+# All aliases use the backend set through the environment variable CACHE_BACKEND.
+# The default file based cache is shared by all the workers on a host without any
+# outside service, use memcached(or a dotted path to e.g. a redis backend) across hosts.
+#
+# The file and db caches hold at most CACHE_MAX_ENTRIES per alias and, once full, remove a third of
+# their entries. Django's file cache lists its whole directory on every set to know whether it is full,
+# about 17ms with 10,000 entries, hence utils.cache.FileBasedCache does it once every CULL_INTERVAL
+# seconds per process, removes the expired entries first and never the ones set without a timeout.
+# The db cache counts its rows on every set and removes the first keys in order, the expired ones first.
+# Whatever is culled is rebuilt when next needed: the stamps of the listings, the ids of the ideas of
+# the tags and the cached pages and feeds(querysets), the cards of the ideas(fragments), the MX records
+# of the domains(default) and the sessions, which are kept in the database as well. On the db cache the
+# version of the tag index(querysets) may be culled too, which makes every process build the index again.
+CACHE_BACKENDS = {
+    'file': 'utils.cache.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+# alias: timeout in seconds
+CACHE_TIMEOUTS = {
+    'default': 300,
+    # rendered parts of the templates
+    'fragments': 60 * 60 * 24,
+    # results of the queries
+    'querysets': 60 * 10,
+    'sessions': 60 * 60 * 24 * 14,
+}
+
+# alias: entries held by the file and db caches
+CACHE_MAX_ENTRIES = {
+    'default': 10_000,
+    # a card per idea shown in the listings
+    'fragments': 20_000,
+    # stamps, ids and pages of the listings per tag and conceiver, the feeds and the tag index
+    'querysets': 50_000,
+    # a session per visitor, which outlive the other entries
+    'sessions': 50_000,
+}
+
+
+def get_cache_config(alias, timeout, backend=cache_backend, location=cache_location):
+    """
+    Returns
+        dict: configuration of the cache `alias` for the `backend`
+
+    Args:
+        alias: str
+            name of the cache.
+        timeout: int
+            default timeout of the keys in seconds.
+        backend: str
+            one of the keys of `CACHE_BACKENDS` or the dotted path to a cache backend.
+        location: str
+            directory for file, table for db and host:port for memcached based caches.
+    """
+    config = {
+        'BACKEND': CACHE_BACKENDS.get(backend, backend),
+        'TIMEOUT': timeout,
+        'KEY_PREFIX': project_name,
+        'OPTIONS': {},
+    }
+    if backend == 'file':
+        config['LOCATION'] = os.path.join(location or os.path.join(BASE_DIR, '.cache'), alias)
+        config['OPTIONS']['MAX_ENTRIES'] = CACHE_MAX_ENTRIES[alias]
+        config['OPTIONS']['CULL_INTERVAL'] = 30
+    elif backend == 'db':
+        config['LOCATION'] = f'{location or "cache"}_{alias}'
+        config['OPTIONS']['MAX_ENTRIES'] = CACHE_MAX_ENTRIES[alias]
+    elif backend == 'locmem':
+        config['LOCATION'] = alias
+    else:
+        # backends with a single location for all the aliases, keys are kept apart by the prefix
+        config['LOCATION'] = location or ''
+        config['KEY_PREFIX'] = f'{project_name}:{alias}'
+    return config
+
+
+CACHES = {alias: get_cache_config(alias, timeout) for alias, timeout in CACHE_TIMEOUTS.items()}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+##############################################################################
+
+# Moderation ############################
+# Hide the flagged content from the public listings, filtering on the state of the flag copied to the content.
+HIDE_FLAGGED_CONTENT = False
+##############################################################################
+
+# Search ############################
+# Dotted path to the backend used to search the ideas(see ideas.search), when None it is
+# FTS5 on sqlite and an inverted index of the words of the ideas on other databases.
+IDEA_SEARCH_BACKEND = None
+##############################################################################
+
+# View counts ############################
+# The views of the ideas are counted by each process and written to the database by a thread of the process
+# once every this many seconds and as it exits, the command flush_idea_views adds them to the ideas.
+# A process that is killed loses the views counted since. None writes them only as the process exits.
+IDEA_VIEWS_BUFFER_SECONDS = 10
+##############################################################################
+
+# Tag autocompletion ############################
+# Seconds for which a process keeps ranking the tags by their counts once they changed(see ideas.tag_index),
+# the index is built again only when a tag is created, renamed or deleted.
+TAG_INDEX_COUNTS_SECONDS = 60
+##############################################################################
+
+# Hot ideas ############################
+# An idea created this many seconds later ranks as high as one with ten times its views(see ideas.utils.get_hot_score),
+# each of its flags cancels a tenfold of its views. The command update_hot_scores scores again the ideas
+# created within the last IDEA_HOT_WINDOW_DAYS, the older ones can no longer compete with the new ideas.
+IDEA_HOT_DECAY_SECONDS = 60 * 60 * 12
+IDEA_HOT_FLAG_PENALTY = 1.0
+IDEA_HOT_WINDOW_DAYS = 7
+##############################################################################
+
+# Email validation ############################
+# Seconds for which the result of looking up the MX records of a domain is kept in the default cache,
+# domains without them are looked up again sooner in case it was a transient failure.
+EMAIL_DOMAIN_CACHE_TIMEOUT = 60 * 60 * 24
+EMAIL_DOMAIN_NEGATIVE_CACHE_TIMEOUT = 60 * 15
+##############################################################################
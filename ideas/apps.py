@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class IdeaConfig(AppConfig):
     name = 'ideas'
+
+    def ready(self):
+        from ideas.extractor import get_extractor
+
+        # load the TLDs while the process starts rather than during its first request
+        get_extractor()
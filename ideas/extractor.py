@@ -0,0 +1,39 @@
+"""
+A url extractor shared by the whole process.
+
+The TLDs are read from the snapshot bundled in `ideas/data` the first time the extractor
+is used, the list is never downloaded so that no request waits on the network.
+To refresh the snapshot, replace it with https://data.iana.org/TLD/tlds-alpha-by-domain.txt
+"""
+import os
+import threading
+
+from urlextract import URLExtract
+
+TLDS_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+_extractor = None
+_lock = threading.Lock()
+
+
+class OfflineURLExtract(URLExtract):
+    """`URLExtract` reading the TLDs from the bundled snapshot only"""
+
+    def _get_cache_file_path(self, cache_dir=None):
+        return os.path.join(TLDS_DIR, self._CACHE_FILE_NAME)
+
+    def _download_tlds_list(self):
+        return False
+
+
+def get_extractor():
+    """
+    Returns
+        OfflineURLExtract: the extractor of the process, built on the first call.
+    """
+    global _extractor
+    if _extractor is None:
+        with _lock:
+            if _extractor is None:
+                _extractor = OfflineURLExtract()
+    return _extractor
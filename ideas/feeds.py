@@ -0,0 +1,175 @@
+"""RSS feeds of the latest public ideas, overall, of a tag and of a conceiver"""
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.syndication.views import Feed
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy as _
+from taggit.models import Tag
+
+from ideas.models import Idea, get_tagged_idea_ids
+from ideas.views import meta_home
+from utils.conditional import get_listing_stamp
+
+DEFAULT_FEED_DEPTH = 50
+MAX_FEED_DEPTH = 500
+FEED_KEY = 'feed:{name}:{host}:{target}:{depth}:{stamp}'
+# reversed once per feed instead of once per idea
+SLUG_PLACEHOLDER = 'idea-slug-placeholder'
+
+
+class FeedTarget:
+    """
+    What a request asks the feed for, the feeds are shared by all the requests
+    hence nothing specific to one of them is stored on the feed itself.
+
+    Args
+        depth: int
+            The number of ideas in the feed.
+        obj: Tag or User
+            The tag or the conceiver of the ideas, None for all of them.
+    """
+    def __init__(self, depth, obj=None):
+        self.depth = depth
+        self.obj = obj
+
+
+class CachedIdeaFeed(Feed):
+    """
+    Serve the serialized feed from the cache, it is generated again only after the ideas it lists
+    change(see utils.conditional). Clients sending If-Modified-Since are answered with 304 until then.
+
+    The depth of the feed is set by the query parameter `depth`, at most `MAX_FEED_DEPTH` ideas.
+    """
+    name = None
+    description = meta_home.description
+
+    def get_depth(self, request):
+        try:
+            depth = int(request.GET.get('depth', DEFAULT_FEED_DEPTH))
+        except ValueError:
+            depth = DEFAULT_FEED_DEPTH
+        return min(max(depth, 1), MAX_FEED_DEPTH)
+
+    def get_object(self, request, *args, **kwargs):
+        return FeedTarget(self.get_depth(request))
+
+    def get_listing_keys(self, target):
+        """Returns list of the keys of the listings whose changes change the feed"""
+        raise NotImplementedError
+
+    def get_ideas(self, target):
+        """Returns QuerySet of the public ideas listed by the feed, the latest first"""
+        raise NotImplementedError
+
+    def __call__(self, request, *args, **kwargs):
+        target = self.get_object(request, *args, **kwargs)
+        last_modified = get_listing_stamp(self.get_listing_keys(target))
+        response = get_conditional_response(request, last_modified=int(last_modified))
+        if response is None:
+            cache = caches['querysets']
+            key = FEED_KEY.format(
+                name=self.name, host=request.get_host(), target=getattr(target.obj, 'pk', ''),
+                depth=target.depth, stamp=last_modified
+            )
+            content = cache.get(key)
+            if content is None:
+                content = self.get_feed(target, request).writeString('utf-8')
+                cache.set(key, content)
+            response = HttpResponse(content, content_type=self.feed_type.content_type)
+        response['Last-Modified'] = http_date(int(last_modified))
+        return response
+
+    def load_ideas(self, target):
+        """Returns list: the first `target.depth` ideas of `get_ideas` along with their conceivers"""
+        return list(self.get_ideas(target).select_related('user')[:target.depth])
+
+    def items(self, target):
+        ideas = self.load_ideas(target)
+        prefix, suffix = reverse('ideas:idea-details', kwargs={'slug': SLUG_PLACEHOLDER}).split(SLUG_PLACEHOLDER)
+        for idea in ideas:
+            idea.feed_link = f'{prefix}{idea.slug}{suffix}'
+        return ideas
+
+    def item_title(self, item):
+        return item.title
+
+    def item_author_name(self, item):
+        if item.user is None:
+            return AnonymousUser.username
+        return item.user.get_full_name()
+
+    def item_description(self, item):
+        return item.concept
+
+    def item_link(self, item):
+        return item.feed_link
+
+    def item_pubdate(self, item):
+        return item.date_created
+
+    def item_updateddate(self, item):
+        return item.date_updated
+
+
+class LatestIdeaRSSFeed(CachedIdeaFeed):
+    """"Publish the RSS feed for latest public ideas"""
+    name = 'latest'
+    title = _('Latest ideas from IdeaFare')
+    link = ''
+
+    def get_listing_keys(self, target):
+        return ['ideas']
+
+    def get_ideas(self, target):
+        return Idea.public_objects.order_by('-date_created', '-id')
+
+
+class TaggedIdeaRSSFeed(CachedIdeaFeed):
+    """Publish the RSS feed for latest public ideas with a tag"""
+    name = 'tag'
+
+    def get_object(self, request, slug):
+        return FeedTarget(self.get_depth(request), get_object_or_404(Tag, slug=slug.lower()))
+
+    def title(self, target):
+        return _('Latest ideas with the tag %(tag)s from IdeaFare') % {'tag': target.obj.name}
+
+    def link(self, target):
+        return reverse('ideas:tagged', kwargs={'slug': target.obj.slug})
+
+    def get_listing_keys(self, target):
+        return [f'ideas:tag:{target.obj.pk}']
+
+    def load_ideas(self, target):
+        # the ids of the ideas of the tag are cached for its listing, the latest first
+        idea_ids = get_tagged_idea_ids(target.obj)[:target.depth]
+        ideas = Idea.public_objects.get_by_ids(idea_ids)
+        return [ideas[idea_id] for idea_id in idea_ids if idea_id in ideas]
+
+
+class ConceiverIdeaRSSFeed(CachedIdeaFeed):
+    """Publish the RSS feed for latest public ideas of a conceiver, all anonymous users are considered the same"""
+    name = 'conceiver'
+
+    def get_object(self, request, username):
+        if username == AnonymousUser.username:
+            return FeedTarget(self.get_depth(request))
+        return FeedTarget(self.get_depth(request), get_object_or_404(User, username=username.lower()))
+
+    def title(self, target):
+        name = target.obj.get_full_name() if target.obj else AnonymousUser.username
+        return _('Latest ideas by %(name)s from IdeaFare') % {'name': name}
+
+    def link(self, target):
+        username = target.obj.username if target.obj else AnonymousUser.username
+        return reverse('ideas:conceiver-ideas', kwargs={'username': username})
+
+    def get_listing_keys(self, target):
+        return [f'ideas:conceiver:{target.obj.pk if target.obj else "anonymous"}']
+
+    def get_ideas(self, target):
+        return Idea.public_objects.filter(user=target.obj).order_by('-date_created', '-id')
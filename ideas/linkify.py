@@ -0,0 +1,36 @@
+"""Render the concept of an idea as html, with the urls in it turned into links"""
+import re
+
+from django.utils.html import escape, format_html
+
+from ideas.extractor import get_extractor
+
+
+def get_href(url):
+    """Returns the url with a scheme so that it isn't resolved relative to the site"""
+    if '://' in url or url.startswith('mailto:'):
+        return url
+    return 'http://' + url
+
+
+def linkify(text):
+    """
+    Returns
+        str: html with `text` escaped and every url in it wrapped in an anchor.
+
+    Args
+        text: str
+            The plain text, it is never modified, so rendering the same text always gives the same html.
+    """
+    urls = get_extractor().find_urls(text, only_unique=True)
+    if not urls:
+        return escape(text)
+
+    # longer urls first so that a url contained in another one doesn't split it
+    pattern = re.compile('({})'.format('|'.join(map(re.escape, sorted(urls, key=len, reverse=True)))))
+    # split with a capturing group alternates between the text and the urls
+    parts = pattern.split(text)
+    return ''.join(
+        format_html('<a href="{}" rel="nofollow noopener">{}</a>', get_href(part), part) if index % 2 else escape(part)
+        for index, part in enumerate(parts)
+    )
@@ -0,0 +1,67 @@
+"""Print the query plans of the hot queries made on ideas, optionally seeding synthetic ideas first"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ideas.models import Idea
+from utils.pagination import KeysetPaginator
+
+SEED_BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plans and timings of the hot idea queries. '
+        'Run it before and after migrating to compare the effect of the indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Number of synthetic ideas to insert before explaining, e.g. 1000000'
+        )
+
+    def seed(self, total):
+        """Bulk insert `total` ideas, every 10th of them private"""
+        now = timezone.now()
+        start = Idea.objects.count()
+        for offset in range(0, total, SEED_BATCH_SIZE):
+            Idea.objects.bulk_create([
+                Idea(
+                    title=f'Seeded idea {number}',
+                    concept=f'Concept of the seeded idea {number}',
+                    slug=f'seeded-idea-{number}',
+                    visibility=bool(number % 10),
+                    date_created=now - timezone.timedelta(seconds=number),
+                )
+                for number in range(start + offset, start + min(offset + SEED_BATCH_SIZE, total))
+            ])
+            self.stdout.write(f'Seeded {min(offset + SEED_BATCH_SIZE, total)}/{total} ideas')
+
+    def get_queries(self):
+        public = Idea.public_objects.all()
+        last = public.order_by('date_created', 'id').first()
+        paginator = KeysetPaginator(public, 15)
+        deep_cursor = paginator.encode_cursor(last, previous=True) if last else None
+        slug = last.slug if last else ''
+        return {
+            'home (first page)': public[:16],
+            'home (offset page 10000)': public[150_000:150_015],
+            'home (keyset deep page)': paginator.get_queryset(deep_cursor),
+            'home hot (first page)': public.order_by('-hot_score', '-id')[:16],
+            'latest entry': public.order_by('-date_created')[:1],
+            'conceiver (anonymous, public)': Idea.public_objects.filter(user=None)[:16],
+            'idea detail (slug)': Idea.objects.filter(slug=slug),
+        }
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        for name, queryset in self.get_queries().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain())
+            start = time.perf_counter()
+            list(queryset)
+            self.stdout.write(f'{(time.perf_counter() - start) * 1000:.2f} ms\n')
@@ -0,0 +1,15 @@
+"""Add the views of the ideas written by the processes to the ideas, run it periodically(e.g. every minute)"""
+from django.core.management.base import BaseCommand
+
+from ideas.view_counts import flush_views
+
+
+class Command(BaseCommand):
+    help = (
+        'Add the views of the ideas written by the processes since the last run to their view counts, '
+        'the views wait in the database until then.'
+    )
+
+    def handle(self, *args, **options):
+        updated, views = flush_views()
+        self.stdout.write(f'{views} views of {updated} ideas flushed')
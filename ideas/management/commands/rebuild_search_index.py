@@ -0,0 +1,31 @@
+"""Index all the ideas again for the full text search, e.g. after bulk inserts that skip the signals"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ideas import search
+from ideas.models import Idea
+
+
+class Command(BaseCommand):
+    help = 'Clear the search index of the ideas and fill it again, in batches of ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of ideas indexed at a time')
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        ideas = Idea.objects.only('id', 'title', 'concept').prefetch_related('tags').order_by('id')
+        indexed = 0
+        last_id = 0
+        with transaction.atomic():
+            backend.clear()
+            while True:
+                batch = list(ideas.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                backend.index_many(batch)
+                indexed += len(batch)
+                last_id = batch[-1].id
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Indexed {indexed} ideas')
+        self.stdout.write(f'{indexed} ideas indexed by {type(backend).__name__}')
@@ -0,0 +1,19 @@
+"""Count the ideas of every tag again, run it periodically(e.g. hourly) for the counts of the last day and week"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ideas import tag_index
+from ideas.models import TagStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the counts of the ideas of every tag. The counts of the last day and week '
+        'only decrease through it as the ideas grow older.'
+    )
+
+    def handle(self, *args, **options):
+        counted = TagStats.objects.rebuild()
+        # the autocompletion ranks the tags by their counts
+        transaction.on_commit(tag_index.invalidate_counts)
+        self.stdout.write(f'{counted} tags counted')
@@ -0,0 +1,30 @@
+"""Score the recent ideas again for the hot ideas, run it periodically(e.g. after flush_idea_views)"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ideas.models import Idea
+from utils.conditional import touch_listings
+
+
+class Command(BaseCommand):
+    help = (
+        'Score again the ideas created within the last IDEA_HOT_WINDOW_DAYS whose views or flags have changed, '
+        'or all of them with --all(e.g. after changing the settings of the score).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Score all the ideas, not only the recent ones')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of ideas scored at a time')
+
+    def handle(self, *args, **options):
+        ideas = Idea.objects.all()
+        if not options['all']:
+            ideas = ideas.filter(
+                date_created__gte=timezone.now() - timezone.timedelta(days=settings.IDEA_HOT_WINDOW_DAYS)
+            )
+        updated = ideas.update_hot_scores(batch_size=options['batch_size'])
+        if updated:
+            # the order of the hot ideas has changed
+            touch_listings(['ideas'])
+        self.stdout.write(f'{updated} ideas scored')
@@ -1,15 +1,206 @@
-from django.db.models import Manager
+import math
 
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Manager, PositiveIntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
 
-class IdeaManager(Manager):
+from ideas.utils import get_hot_score
+
+
+class IdeaQuerySet(QuerySet):
+    def for_listing(self):
+        """
+        Returns
+            QuerySet
+                the ideas along with their conceivers and tags, which are loaded
+                in batches instead of a query per idea.
+        """
+        return self.select_related('user').prefetch_related('tags')
+
+    def get_by_ids(self, id_list):
+        """
+        Returns
+            dict
+                the ideas of the queryset with the ids, by their ids.
+        """
+        return self.in_bulk(id_list)
+
+    def search(self, query, limit=None):
+        """
+        Returns
+            list
+                the ideas of the queryset matching the words in the query(the last of them as a prefix),
+                the best match first, with the attributes `search_rank` and `search_snippet`.
+
+        Args
+            query: str
+            limit: int
+                The maximum number of ideas returned.
+        """
+        from ideas import search
+
+        return search.search(self, query, limit or search.SEARCH_RESULTS_LIMIT)
+
+    def add_views(self, counts, batch_size=500):
+        """
+        Add the number of times each of the ideas was viewed to their `views`, in a single
+        `UPDATE ... CASE` per batch of ideas.
+
+        Returns
+            int: the number of ideas updated.
+
+        Args
+            counts: dict
+                The number of views of each idea by its id.
+        """
+        idea_ids = list(counts)
+        updated = 0
+        for start in range(0, len(idea_ids), batch_size):
+            batch = idea_ids[start:start + batch_size]
+            views = Case(
+                *[When(id=idea_id, then=Value(counts[idea_id])) for idea_id in batch],
+                default=Value(0), output_field=PositiveIntegerField()
+            )
+            updated += self.filter(id__in=batch).update(views=F('views') + views)
+        return updated
+
+    def update_hot_scores(self, batch_size=1000):
+        """
+        Score the ideas of the queryset again(see ideas.utils.get_hot_score), in batches of ids.
+        Only the ideas whose score changed with their views or flags are written, in a single
+        `UPDATE ... CASE` per batch.
+
+        Returns
+            int: the number of ideas whose score changed.
+        """
+        ideas = self.order_by('id').values_list('id', 'views', 'flag_count', 'date_created', 'hot_score')
+        updated = 0
+        last_id = 0
+        while True:
+            rows = list(ideas.filter(id__gt=last_id)[:batch_size])
+            scores = {}
+            for idea_id, views, flag_count, date_created, hot_score in rows:
+                score = get_hot_score(views, flag_count, date_created)
+                if not math.isclose(score, hot_score, rel_tol=0, abs_tol=1e-9):
+                    scores[idea_id] = score
+            if scores:
+                updated += self.model.objects.filter(id__in=scores).update(hot_score=Case(
+                    *[When(id=idea_id, then=Value(score)) for idea_id, score in scores.items()],
+                    default=F('hot_score'), output_field=FloatField()
+                ))
+            if len(rows) < batch_size:
+                return updated
+            last_id = rows[-1][0]
+
+
+class IdeaManager(Manager.from_queryset(IdeaQuerySet)):
     def get_queryset(self, order='-date_created'):
         """
         Returns
             QuerySet
-                the set of ideas that are public
+                the set of ideas that are public, without the flagged ones when
+                the setting `HIDE_FLAGGED_CONTENT` is True.
 
         Args
             order: str
                 The field according to which the list will be sorted
         """
-        return super().get_queryset().filter(visibility=True)
+        queryset = super().get_queryset().filter(visibility=True)
+        if getattr(settings, 'HIDE_FLAGGED_CONTENT', False):
+            queryset = queryset.exclude(flag_state__in=self.model.HIDDEN_FLAG_STATES)
+        return queryset
+
+    def is_public(self, idea):
+        """Returns bool: whether the loaded idea is among those of `get_queryset`, without a query"""
+        if not idea.visibility:
+            return False
+        hide_flagged = getattr(settings, 'HIDE_FLAGGED_CONTENT', False)
+        return not (hide_flagged and idea.flag_state in self.model.HIDDEN_FLAG_STATES)
+
+    def get_by_ids(self, id_list):
+        """
+        Returns
+            dict
+                the public ideas with the ids, along with their conceivers, by their ids.
+
+        The ideas are looked up by their primary keys alone and checked to be public once loaded,
+        the conditions on the public ideas would let the database pick the index of their listing instead.
+        """
+        ideas = self.model.objects.select_related('user').in_bulk(id_list)
+        return {idea_id: idea for idea_id, idea in ideas.items() if self.is_public(idea)}
+
+
+class TagStatsManager(Manager):
+    # the field holding the count of each period
+    PERIOD_FIELDS = {'day': 'count_day', 'week': 'count_week', 'all': 'count'}
+    PERIODS = {'day': timezone.timedelta(days=1), 'week': timezone.timedelta(days=7)}
+
+    def update_counts(self, tag_ids, delta, date_created):
+        """
+        Add `delta` to the counts of the tags in a single query, the counts of the periods
+        are changed only if the idea was created within them.
+
+        Args
+            tag_ids: iterable
+                The ids of the tags added to or removed from an idea.
+            delta: int
+                1 when the tags were added, -1 when removed.
+            date_created: datetime
+                The creation date of the idea.
+        """
+        tag_ids = list(tag_ids or [])
+        if not tag_ids:
+            return
+        if delta > 0:
+            self.bulk_create([self.model(tag_id=tag_id) for tag_id in tag_ids], ignore_conflicts=True)
+
+        age = timezone.now() - date_created
+        fields = {
+            self.PERIOD_FIELDS[period]: Greatest(F(self.PERIOD_FIELDS[period]) + delta, 0)
+            for period, duration in self.PERIODS.items() if age <= duration
+        }
+        self.filter(tag_id__in=tag_ids).update(count=Greatest(F('count') + delta, 0), **fields)
+
+    def rebuild(self):
+        """
+        Count the ideas of every tag again, the counts of the periods shrink only through it
+        as the ideas grow older.
+
+        Returns
+            int: the number of tags counted.
+        """
+        Idea = apps.get_model('ideas', 'Idea')
+        now = timezone.now()
+        rows = Idea.objects.filter(tags__isnull=False).values('tags').annotate(
+            count=Count('id'),
+            **{
+                self.PERIOD_FIELDS[period]: Count('id', filter=Q(date_created__gte=now - duration))
+                for period, duration in self.PERIODS.items()
+            }
+        ).order_by()
+        stats = [self.model(tag_id=row.pop('tags'), **row) for row in rows]
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(stats, batch_size=1000)
+        return len(stats)
+
+    def trending(self, period='day', limit=20):
+        """
+        Returns
+            QuerySet: the stats of the tags used by most of the ideas created within the period,
+                along with their tags.
+
+        Args
+            period: str
+                One of day, week and all.
+            limit: int
+        """
+        field = self.PERIOD_FIELDS[period]
+        return (
+            self.filter(**{f'{field}__gt': 0})
+            .select_related('tag')
+            .order_by(f'-{field}', '-count', 'tag_id')[:limit]
+        )
@@ -0,0 +1,42 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:14
+
+from django.db import migrations, models
+from django.db.models import Count
+
+MAX_SLUG_LENGTH = 80
+
+
+def deduplicate_slugs(apps, schema_editor):
+    """Suffix duplicated slugs with the id of the idea so that a unique index can be built"""
+    Idea = apps.get_model('ideas', 'Idea')
+    duplicates = Idea.objects.values('slug').annotate(total=Count('id')).filter(total__gt=1)
+    for duplicate in duplicates:
+        # the oldest idea keeps its slug
+        for idea_id in Idea.objects.filter(slug=duplicate['slug']).order_by('id').values_list('id', flat=True)[1:]:
+            suffix = f'-{idea_id}'
+            slug = duplicate['slug'][:MAX_SLUG_LENGTH - len(suffix)] + suffix
+            Idea.objects.filter(id=idea_id).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0005_idea_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='idea',
+            name='slug',
+            field=models.SlugField(default='', max_length=80, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(condition=models.Q(visibility=True), fields=['visibility', '-date_created', '-id'], name='idea_public_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['user', 'visibility', '-date_created', '-id'], name='idea_conceiver_latest_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:23
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+# anchors used to be written into the concept on every save, nesting them with each edit
+ANCHOR = re.compile(r'<a href=[^<>\s]*>([^<>]*)</a>')
+
+
+def unwrap_anchors(concept):
+    """Returns the concept with the anchors written by the previous saves removed, innermost first"""
+    previous = None
+    while previous != concept:
+        previous, concept = concept, ANCHOR.sub(r'\1', concept)
+    return concept
+
+
+def render_concepts(apps, schema_editor):
+    """Restore the raw concepts and render them as html"""
+    from ideas.linkify import linkify
+
+    Idea = apps.get_model('ideas', 'Idea')
+    ideas = []
+    for idea in Idea.objects.only('id', 'concept').iterator(chunk_size=BATCH_SIZE):
+        idea.concept = unwrap_anchors(idea.concept)
+        idea.concept_html = linkify(idea.concept)
+        ideas.append(idea)
+        if len(ideas) == BATCH_SIZE:
+            Idea.objects.bulk_update(ideas, ['concept', 'concept_html'])
+            ideas = []
+    Idea.objects.bulk_update(ideas, ['concept', 'concept_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0006_idea_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idea',
+            name='concept_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(render_concepts, migrations.RunPython.noop),
+    ]
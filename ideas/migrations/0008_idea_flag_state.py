@@ -0,0 +1,42 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+def copy_flag_states(apps, schema_editor):
+    """Copy the state and the count of the existing flags to the ideas"""
+    Idea = apps.get_model('ideas', 'Idea')
+    Flag = apps.get_model('flag', 'Flag')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    try:
+        ctype = ContentType.objects.get(app_label='ideas', model='idea')
+    except ContentType.DoesNotExist:
+        return
+    flag = Flag.objects.filter(content_type=ctype, object_id=models.OuterRef('pk'))
+    Idea.objects.filter(models.Exists(flag)).update(
+        flag_state=models.Subquery(flag.values('state')[:1]),
+        flag_count=models.Subquery(flag.values('count')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('flag', '0002_flag_state_count_idx'),
+        ('ideas', '0007_idea_concept_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idea',
+            name='flag_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='idea',
+            name='flag_state',
+            field=models.SmallIntegerField(choices=[(1, 'Unflagged'), (2, 'Flagged'), (3, 'Flag rejected by moderator'), (4, 'Creator notified'), (5, 'Content modified or deleted')], db_index=True, default=1, editable=False),
+        ),
+        migrations.RunPython(copy_flag_states, migrations.RunPython.noop),
+    ]
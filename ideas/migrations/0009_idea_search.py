@@ -0,0 +1,68 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:41
+
+from django.db import migrations, models, transaction
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+FTS_TABLE = 'ideas_idea_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    """
+    Create and fill the FTS5 table on sqlite, other databases use `IdeaSearchTerm`
+    which is filled by the command rebuild_search_index.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"title, concept, tags, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+    except OperationalError:
+        # sqlite was built without FTS5
+        return
+
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    content_type = ContentType.objects.filter(app_label='ideas', model='idea').first()
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, concept, tags) "
+        f"SELECT idea.id, idea.title, idea.concept, COALESCE(("
+        f"  SELECT group_concat(tag.name, ' ') FROM taggit_taggeditem item"
+        f"  INNER JOIN taggit_tag tag ON tag.id = item.tag_id"
+        f"  WHERE item.object_id = idea.id AND item.content_type_id = %s"
+        f"), '') FROM ideas_idea idea",
+        [content_type.id if content_type else None]
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0003_taggeditem_add_unique_index'),
+        ('ideas', '0008_idea_flag_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaSearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('idea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='ideas.Idea')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ideasearchterm',
+            index=models.Index(fields=['term', 'idea'], name='idea_search_term_idx'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
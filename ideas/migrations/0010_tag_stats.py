@@ -0,0 +1,64 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:04
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def count_tags(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Idea = apps.get_model('ideas', 'Idea')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    TagStats = apps.get_model('ideas', 'TagStats')
+
+    content_type = ContentType.objects.filter(app_label='ideas', model='idea').first()
+    if content_type is None:
+        return
+    now = timezone.now()
+    rows = TaggedItem.objects.filter(content_type=content_type).values('tag').annotate(
+        count=models.Count('id'),
+        count_day=models.Count('id', filter=models.Q(
+            object_id__in=Idea.objects.filter(date_created__gte=now - timezone.timedelta(days=1)).values('id')
+        )),
+        count_week=models.Count('id', filter=models.Q(
+            object_id__in=Idea.objects.filter(date_created__gte=now - timezone.timedelta(days=7)).values('id')
+        )),
+    ).order_by()
+    TagStats.objects.bulk_create([TagStats(tag_id=row.pop('tag'), **row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0003_taggeditem_add_unique_index'),
+        ('ideas', '0009_idea_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStats',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='taggit.Tag')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('count_day', models.PositiveIntegerField(default=0)),
+                ('count_week', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'tag stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tagstats',
+            index=models.Index(fields=['-count_day', '-count'], name='tag_stats_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tagstats',
+            index=models.Index(fields=['-count_week', '-count'], name='tag_stats_week_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tagstats',
+            index=models.Index(fields=['-count'], name='tag_stats_count_idx'),
+        ),
+        migrations.RunPython(count_tags, migrations.RunPython.noop),
+    ]
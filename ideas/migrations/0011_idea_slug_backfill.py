@@ -0,0 +1,36 @@
+# Generated by Django 3.0.7 on 2026-10-18 19:02
+
+from django.db import migrations
+
+from ideas.utils import get_idea_slug
+
+MAX_SLUG_LENGTH = 80
+BATCH_SIZE = 1000
+
+
+def backfill_slugs(apps, schema_editor):
+    """
+    Give the ideas saved without a slug(e.g. through `bulk_create`) one derived from their id.
+    The existing slugs are kept as they are unique already(see 0006) and are part of shared links.
+    """
+    Idea = apps.get_model('ideas', 'Idea')
+    last_id = 0
+    while True:
+        ideas = list(Idea.objects.filter(slug='', id__gt=last_id).order_by('id').only('id', 'title')[:BATCH_SIZE])
+        if not ideas:
+            return
+        for idea in ideas:
+            idea.slug = get_idea_slug(idea.title, idea.id, MAX_SLUG_LENGTH)
+        Idea.objects.bulk_update(ideas, ['slug'])
+        last_id = ideas[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0010_tag_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0011_idea_slug_backfill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idea',
+            name='views',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
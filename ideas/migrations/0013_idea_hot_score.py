@@ -0,0 +1,43 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+from ideas.utils import get_hot_score
+
+BATCH_SIZE = 1000
+
+
+def score_ideas(apps, schema_editor):
+    """Score the existing ideas, before the index is built"""
+    Idea = apps.get_model('ideas', 'Idea')
+    last_id = 0
+    while True:
+        ideas = list(
+            Idea.objects.filter(id__gt=last_id).order_by('id').only('id', 'views', 'flag_count', 'date_created')[:BATCH_SIZE]
+        )
+        if not ideas:
+            return
+        for idea in ideas:
+            idea.hot_score = get_hot_score(idea.views, idea.flag_count, idea.date_created)
+        Idea.objects.bulk_update(ideas, ['hot_score'])
+        last_id = ideas[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0012_idea_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idea',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(score_ideas, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(condition=models.Q(visibility=True), fields=['visibility', '-hot_score', '-id'], name='idea_public_hot_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0013_idea_hot_score'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='idea',
+            name='idea_public_latest_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='idea',
+            name='idea_public_hot_idx',
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(condition=models.Q(visibility=True), fields=['-date_created', '-id'], name='idea_public_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(condition=models.Q(visibility=True), fields=['-hot_score', '-id'], name='idea_public_hot_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.0.7 on 2026-10-18 21:04
+
+import uuid
+
+from django.db import migrations, models, transaction
+
+from ideas.utils import get_idea_slug, is_idea_slug
+
+MAX_SLUG_LENGTH = 80
+BATCH_SIZE = 1000
+
+
+def derive_slugs(apps, schema_editor):
+    """
+    Give every idea the slug derived from its id(see get_idea_slug), keeping the random one it was
+    given before in `legacy_slug` for its links to be redirected. A random slug may equal the new slug
+    of another idea, it is moved aside first and replaced once its own batch is reached. Each batch is
+    committed on its own, the ideas already given their new slug are skipped when it is run again.
+    """
+    Idea = apps.get_model('ideas', 'Idea')
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            ideas = list(
+                Idea.objects.filter(id__gt=last_id).order_by('id').only('id', 'title', 'slug', 'legacy_slug')[:BATCH_SIZE]
+            )
+            if not ideas:
+                return
+            last_id = ideas[-1].id
+            ideas = [idea for idea in ideas if not is_idea_slug(idea.slug, idea.id)]
+            slugs = {idea.id: get_idea_slug(idea.title, idea.id, MAX_SLUG_LENGTH) for idea in ideas}
+            # only the ideas with a random slug can hold a slug derived from another id, those of
+            # the batch too as the uniqueness may be checked for each row while they are updated
+            blocking = list(Idea.objects.filter(slug__in=slugs.values()).only('id', 'slug', 'legacy_slug'))
+            for idea in blocking:
+                idea.legacy_slug = idea.legacy_slug or idea.slug
+                idea.slug = uuid.uuid4().hex
+            Idea.objects.bulk_update(blocking, ['slug', 'legacy_slug'])
+
+            for idea in ideas:
+                # the ideas saved without a slug(e.g. through `bulk_create`) have no links to keep
+                idea.legacy_slug = idea.legacy_slug or idea.slug or None
+                idea.slug = slugs[idea.id]
+            Idea.objects.bulk_update(ideas, ['slug', 'legacy_slug'])
+
+
+class Migration(migrations.Migration):
+    # every batch is committed on its own instead of locking the ideas until all of them are done
+    atomic = False
+
+    dependencies = [
+        ('ideas', '0014_idea_public_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idea',
+            name='legacy_slug',
+            field=models.SlugField(editable=False, max_length=80, null=True, unique=True),
+        ),
+        migrations.RunPython(derive_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0015_idea_legacy_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingViews',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('views', models.PositiveIntegerField()),
+                ('claim', models.CharField(db_index=True, max_length=32, null=True)),
+                ('idea', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='ideas.Idea')),
+            ],
+            options={
+                'verbose_name_plural': 'pending views',
+            },
+        ),
+    ]
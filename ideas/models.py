@@ -1,29 +1,39 @@
-import secrets
+import uuid
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.contenttypes.fields import GenericRelation
-from django.db import models
-from django.template.defaultfilters import slugify
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from taggit.managers import TaggableManager
-from urlextract import URLExtract
+from taggit.models import Tag
 
-from flag.models import Flag
-from ideas.manager import IdeaManager
+from flag.models import Flag, FlagStateMixin
+from ideas import search, tag_index
+from ideas.linkify import linkify
+from ideas.manager import IdeaManager, IdeaQuerySet, TagStatsManager
+from ideas.utils import get_hot_score, get_idea_slug
+from utils.conditional import touch_listings
 
 MAX_TITLE_LENGTH = 60
 MAX_CONCEPT_LENGTH = 500
 MAX_SLUG_LENGTH = 80
-LENGTH_OF_RANDOM_ALPHANUMERIC_SLUG = 4
+IDEA_CARD_FRAGMENT = 'idea_card'
+# the fields of the conceiver shown on the cards of their ideas(see ideas/idea_conceiver.html)
+CONCEIVER_CARD_FIELDS = {'username', 'first_name', 'last_name'}
+TAGGED_IDEA_IDS_KEY = 'tagged_idea_ids:{tag_id}'
 
 User = get_user_model()
 AnonymousUser.username = 'anonymous'
 
 
-class Idea(models.Model):
+class Idea(FlagStateMixin, models.Model):
     # allow anonymous posting
     user = models.ForeignKey(User, blank=True, db_column='conceiver',
                              null=True, on_delete=models.CASCADE)
@@ -32,13 +42,21 @@ class Idea(models.Model):
                              )
     concept = models.CharField(max_length=MAX_CONCEPT_LENGTH,
                                help_text=_('Try to explain your idea in a concise form. Max 500 characters'))
+    # the concept rendered with its links, built only when the concept changes
+    concept_html = models.TextField(default='', editable=False)
     date_created = models.DateTimeField(default=timezone.now)
     date_updated = models.DateTimeField(auto_now=True)
-    slug = models.SlugField(default='', max_length=MAX_SLUG_LENGTH)
+    slug = models.SlugField(default='', max_length=MAX_SLUG_LENGTH, unique=True)
+    # the random slug given before the slugs were derived from the ids, its links are redirected(see 0015)
+    legacy_slug = models.SlugField(max_length=MAX_SLUG_LENGTH, unique=True, null=True, editable=False)
     visibility = models.BooleanField(verbose_name=_('public'), default=True)
+    # written periodically from the counts kept by the processes(see ideas.view_counts)
+    views = models.PositiveIntegerField(default=0, editable=False)
+    # the rank among the hot ideas, scored when the idea is saved and by the command update_hot_scores
+    hot_score = models.FloatField(default=0, editable=False)
     flag = GenericRelation(Flag, related_query_name='idea_flagged')
 
-    objects = models.Manager()
+    objects = IdeaQuerySet.as_manager()
     public_objects = IdeaManager()
     tags = TaggableManager()
 
@@ -52,28 +70,76 @@ class Idea(models.Model):
 
     class Meta:
         ordering = ['-date_created']
+        indexes = [
+            # Used for listing public ideas, backends without support for partial indexes
+            # (e.g. MySQL) ignore the condition and build a plain index instead. The condition
+            # isn't repeated as a column, else the index is picked for any query on the public
+            # ideas, e.g. `visibility AND id IN (...)`, which it serves by scanning all of them.
+            models.Index(
+                fields=['-date_created', '-id'],
+                condition=models.Q(visibility=True),
+                name='idea_public_latest_idx'
+            ),
+            models.Index(
+                fields=['user', 'visibility', '-date_created', '-id'],
+                name='idea_conceiver_latest_idx'
+            ),
+            models.Index(
+                fields=['-hot_score', '-id'],
+                condition=models.Q(visibility=True),
+                name='idea_public_hot_idx'
+            ),
+        ]
+
+    # counted by their own queries(see ideas.view_counts, update_hot_scores and FlagManager.sync_flag_states),
+    # the idea may have been loaded before they changed hence saving it again leaves them as they are
+    DENORMALIZED_FIELDS = ['views', 'hot_score', 'flag_count', 'flag_state']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # either of the fields may have been deferred
+        self._rendered_concept = self.__dict__.get('concept') if self.__dict__.get('concept_html') else None
 
     def save(self, *args, **kwargs):
         """
         set the slug for the first time only
-            - slugify the title with a random alphanumeric
+            - slugify the title with the id of the idea(see get_idea_slug)
+        score the idea for the hot ideas when it is created
+        render the concept as html when it has changed
+        leave out the `DENORMALIZED_FIELDS` when it is saved again, unless they are in `update_fields`
         """
-
-        if self.date_updated is None:
-            self.slug = slugify(
-                self.title + '-' +
-                secrets.token_urlsafe(LENGTH_OF_RANDOM_ALPHANUMERIC_SLUG)
-            )
         # Anonymous Ideas will always be public
         if self.user is None:
             self.visibility = True
 
         # Linkinfy the links
-        extractor = URLExtract()
-        for url in extractor.gen_urls(self.concept):
-            self.concept = self.concept.replace(url, "<a href={}>{}</a>".format(url, url))
+        if self.concept != self._rendered_concept:
+            self.concept_html = linkify(self.concept)
+            self._rendered_concept = self.concept
+
+        if self.date_updated is not None:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+                    and field.attname not in deferred
+                ]
+            elif 'hot_score' in update_fields:
+                self.hot_score = get_hot_score(self.views, self.flag_count, self.date_created)
+            super(Idea, self).save(*args, **kwargs)
+            return
+
+        self.hot_score = get_hot_score(self.views, self.flag_count, self.date_created)
 
-        super(Idea, self).save(*args, **kwargs)
+        # The id is known only after the insert, hence the idea is inserted with a placeholder
+        # that is unique by itself and then updated, no slug is ever tried twice.
+        with transaction.atomic(using=kwargs.get('using')):
+            self.slug = uuid.uuid4().hex
+            super(Idea, self).save(*args, **kwargs)
+            self.slug = get_idea_slug(self.title, self.pk, MAX_SLUG_LENGTH)
+            Idea.objects.filter(pk=self.pk).update(slug=self.slug)
 
     def __str__(self):
         """Returns title when the object is printed"""
@@ -95,4 +161,239 @@ class Idea(models.Model):
         return reverse('ideas:idea-details', kwargs={'slug': self.slug})
 
     def get_tags_list(self):
+        """Returns the tags of the idea, from the prefetched ones when `prefetch_related('tags')` was used"""
         return self.tags.all()
+
+
+class IdeaSearchTerm(models.Model):
+    """A word of an idea in the inverted index used when full text search isn't available(see ideas.search)"""
+    term = models.CharField(max_length=search.MAX_TERM_LENGTH)
+    idea = models.ForeignKey(Idea, on_delete=models.CASCADE, related_name='search_terms')
+    # the sum of the weights of the fields containing the word
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'idea'], name='idea_search_term_idx'),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class TagStats(models.Model):
+    """
+    The number of ideas with the tag, overall and among the ideas created within the last day and week.
+    Kept up to date as tags are added to or removed from ideas, the counts of the periods decrease only when
+    they are rebuilt by the command rebuild_tag_stats.
+    """
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    count = models.PositiveIntegerField(default=0)
+    count_day = models.PositiveIntegerField(default=0)
+    count_week = models.PositiveIntegerField(default=0)
+
+    objects = TagStatsManager()
+
+    class Meta:
+        verbose_name_plural = 'tag stats'
+        indexes = [
+            models.Index(fields=['-count_day', '-count'], name='tag_stats_day_idx'),
+            models.Index(fields=['-count_week', '-count'], name='tag_stats_week_idx'),
+            models.Index(fields=['-count'], name='tag_stats_count_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.tag_id}: {self.count}'
+
+
+class PendingViews(models.Model):
+    """
+    The views of an idea counted by a process, added to `Idea.views` and deleted by the command
+    flush_idea_views(see ideas.view_counts). The processes only insert them, `claim` is set by
+    the flush while it adds them.
+    """
+    # the views of a deleted idea are left to the flush, which finds nothing to update
+    idea = models.ForeignKey(Idea, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    views = models.PositiveIntegerField()
+    claim = models.CharField(max_length=32, null=True, db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'pending views'
+
+    def __str__(self):
+        return f'{self.idea_id}: {self.views}'
+
+
+def get_idea_card_key(idea):
+    """
+    Returns
+        str: the cache key of the card of the idea rendered in `ideas/idea_list.html`.
+    """
+    return make_template_fragment_key(IDEA_CARD_FRAGMENT, [idea.pk, idea.date_updated])
+
+
+def invalidate_idea_card(idea):
+    """Delete the cached card of the idea"""
+    if idea.pk is not None:
+        caches['fragments'].delete(get_idea_card_key(idea))
+
+
+def get_tagged_idea_ids(tag):
+    """
+    Returns
+        list: the ids of the public ideas with the tag, the latest first. Cached until
+            the ideas of the tag change, the ideas must still be fetched through `public_objects.get_by_ids`.
+    """
+    cache = caches['querysets']
+    key = TAGGED_IDEA_IDS_KEY.format(tag_id=tag.id)
+    idea_ids = cache.get(key)
+    if idea_ids is None:
+        idea_ids = list(
+            Idea.public_objects.filter(tags=tag).order_by('-date_created', '-id').values_list('id', flat=True)
+        )
+        cache.set(key, idea_ids)
+    return idea_ids
+
+
+def invalidate_tagged_idea_ids(tag_ids):
+    """Delete the cached ids of the ideas of the tags"""
+    if tag_ids:
+        caches['querysets'].delete_many([TAGGED_IDEA_IDS_KEY.format(tag_id=tag_id) for tag_id in tag_ids])
+
+
+def get_listing_keys(idea, tag_ids=()):
+    """
+    Returns
+        list: the keys of the listings showing the idea, the latest ideas, those of its conceiver
+            and those of the tags(see utils.conditional).
+    """
+    return ['ideas', f'ideas:conceiver:{idea.user_id or "anonymous"}'] + [f'ideas:tag:{tag_id}' for tag_id in tag_ids]
+
+
+def invalidate_listings(idea, tag_ids):
+    """
+    Delete the cached ids of the ideas of the tags and touch the listings showing the idea once
+    the transaction is committed, a request served before would otherwise cache the old ideas again.
+    """
+    tag_ids = list(tag_ids)
+    listing_keys = get_listing_keys(idea, tag_ids)
+
+    def invalidate():
+        invalidate_tagged_idea_ids(tag_ids)
+        touch_listings(listing_keys)
+    transaction.on_commit(invalidate)
+
+
+@receiver(pre_save, sender=Idea)
+def invalidate_idea_card_on_save(sender, instance, **kwargs):
+    # `date_updated` still holds the value the cached card was keyed with,
+    # once saved the key changes and the stale card would only wait to be culled.
+    invalidate_idea_card(instance)
+
+
+@receiver(post_delete, sender=Idea)
+def invalidate_idea_card_on_delete(sender, instance, **kwargs):
+    invalidate_idea_card(instance)
+
+
+@receiver(m2m_changed, sender=Idea.tags.through)
+def invalidate_idea_card_on_tags_change(sender, instance, action, **kwargs):
+    # tags are changed without touching `date_updated`, hence the key remains the same
+    if isinstance(instance, Idea) and action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_idea_card(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_idea_cards_on_conceiver_change(sender, instance, created, raw, update_fields, **kwargs):
+    """
+    Delete the cached cards of the ideas of the user and touch the listings showing them once the
+    transaction is committed, the cards show the name of the conceiver which isn't part of their keys.
+    """
+    if created or raw or (update_fields is not None and not CONCEIVER_CARD_FIELDS.intersection(update_fields)):
+        return
+    ideas = list(Idea.objects.filter(user=instance).only('id', 'user', 'date_updated'))
+    if not ideas:
+        return
+    keys = [get_idea_card_key(idea) for idea in ideas]
+    tag_ids = set(Idea.objects.filter(user=instance, tags__isnull=False).values_list('tags', flat=True))
+    listing_keys = get_listing_keys(ideas[0], tag_ids)
+
+    def invalidate():
+        caches['fragments'].delete_many(keys)
+        touch_listings(listing_keys)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Idea)
+def index_idea_on_save(sender, instance, created, raw, **kwargs):
+    if not raw:
+        # a new idea can not have any tags yet
+        search.index_idea(instance, tags=[] if created else None)
+
+
+@receiver(post_delete, sender=Idea)
+def remove_idea_from_index(sender, instance, **kwargs):
+    search.remove_idea(instance.id)
+
+
+@receiver(m2m_changed, sender=Idea.tags.through)
+def index_idea_on_tags_change(sender, instance, action, **kwargs):
+    if isinstance(instance, Idea) and action in ('post_add', 'post_remove', 'post_clear'):
+        search.index_idea(instance)
+
+
+@receiver(m2m_changed, sender=Idea.tags.through)
+def invalidate_tag_counts_on_tags_change(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(tag_index.invalidate_counts)
+
+
+@receiver(post_delete, sender=Idea)
+def invalidate_tag_counts_on_delete(sender, **kwargs):
+    # the tags of a deleted idea are removed without sending m2m_changed
+    transaction.on_commit(tag_index.invalidate_counts)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_index(sender, **kwargs):
+    transaction.on_commit(tag_index.invalidate)
+
+
+@receiver(m2m_changed, sender=Idea.tags.through)
+def update_tags_of_listings(sender, instance, action, pk_set, **kwargs):
+    """Update the counts of the tags and invalidate the listings of the ideas with them"""
+    if not isinstance(instance, Idea):
+        return
+    if action == 'pre_clear':
+        # the tags are not passed while clearing
+        instance._cleared_tag_ids = list(instance.tags.values_list('id', flat=True))
+    elif action == 'post_clear':
+        tag_ids = getattr(instance, '_cleared_tag_ids', [])
+        TagStats.objects.update_counts(tag_ids, -1, instance.date_created)
+        invalidate_listings(instance, tag_ids)
+    elif action in ('post_add', 'post_remove'):
+        TagStats.objects.update_counts(pk_set, 1 if action == 'post_add' else -1, instance.date_created)
+        invalidate_listings(instance, pk_set)
+
+
+@receiver(pre_delete, sender=Idea)
+def collect_tags_on_delete(sender, instance, **kwargs):
+    # the tags of the idea are deleted along with it, without sending m2m_changed
+    instance._deleted_tag_ids = list(instance.tags.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Idea)
+def update_listings_on_delete(sender, instance, **kwargs):
+    tag_ids = getattr(instance, '_deleted_tag_ids', [])
+    TagStats.objects.update_counts(tag_ids, -1, instance.date_created)
+    invalidate_listings(instance, tag_ids)
+
+
+@receiver(post_save, sender=Idea)
+def update_listings_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    # its visibility or date of creation may have changed, a new idea can not have any tags yet
+    tag_ids = [] if created else list(instance.tags.values_list('id', flat=True))
+    invalidate_listings(instance, tag_ids)
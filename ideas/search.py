@@ -0,0 +1,269 @@
+"""
+Full text search over the title, the concept and the tags of the ideas.
+
+Ideas are indexed whenever they are saved, deleted or their tags change(see ideas.models).
+On sqlite built with FTS5 they are kept in the virtual table `ideas_idea_fts`, the other
+databases fall back to the inverted index stored in `IdeaSearchTerm`. Another backend can
+be used by setting `IDEA_SEARCH_BACKEND` to the dotted path of a subclass of `SearchBackend`.
+"""
+import re
+from collections import Counter, namedtuple
+from functools import partial, reduce
+from operator import or_
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils.html import escape
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'ideas_idea_fts'
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+SEARCH_RESULTS_LIMIT = 150
+SNIPPET_WORDS = 16
+# how much a match in each of the fields counts towards the rank
+FIELD_WEIGHTS = {'title': 10, 'concept': 1, 'tags': 5}
+
+SearchResult = namedtuple('SearchResult', ['id', 'rank'])
+
+_backend = None
+_has_fts_table = None
+
+
+def tokenize(text):
+    """
+    Returns
+        list: the lowercased words of the text, trimmed to `MAX_TERM_LENGTH`.
+    """
+    return [word[:MAX_TERM_LENGTH] for word in re.findall(r'\w+', text.lower())]
+
+
+def highlight(text, terms, words=SNIPPET_WORDS):
+    """
+    Returns
+        str: the escaped window of `words` words from around the first match in the text,
+            with the words starting with any of the terms wrapped in `<mark>`.
+
+    Args
+        text: str
+        terms: list
+            The tokens of the query.
+    """
+    # the words are at odd indices, the text in between them at even indices
+    parts = re.split(r'(\w+)', text)
+    matches = {index for index in range(1, len(parts), 2) if parts[index].lower().startswith(tuple(terms))}
+    # start a word before the first match
+    start = max(min(matches, default=1) - 2, 0)
+    end = start + 2 * words
+    snippet = ''.join(
+        f'<mark>{escape(part)}</mark>' if index in matches else escape(part)
+        for index, part in enumerate(parts[start:end], start)
+    ).strip()
+    return mark_safe(('…' if start else '') + snippet + ('…' if end < len(parts) else ''))
+
+
+class SearchBackend:
+    """The interface that the search backends implement"""
+    def index(self, idea, tags):
+        """Add the idea to the index, replacing its previous entry"""
+        raise NotImplementedError
+
+    def index_many(self, ideas):
+        """Add the ideas, with their tags prefetched, to the index"""
+        for idea in ideas:
+            self.index(idea, [tag.name for tag in idea.tags.all()])
+
+    def remove(self, idea_id):
+        """Remove the idea from the index"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all the ideas from the index"""
+        raise NotImplementedError
+
+    def search(self, terms, limit, offset=0):
+        """
+        Returns
+            list: `SearchResult`(id, rank) of at most `limit` ideas containing each of the terms as a word,
+                the last one as the start of a word(it may still be being typed), the best match first,
+                skipping the first `offset` of them.
+        """
+        raise NotImplementedError
+
+
+class SqliteFTSBackend(SearchBackend):
+    """Search through the FTS5 virtual table, whose `rowid` is the id of the idea"""
+    def _rows(self, ideas):
+        return [
+            (idea.id, idea.title, idea.concept, ' '.join(tag.name for tag in idea.tags.all()))
+            for idea in ideas
+        ]
+
+    def index(self, idea, tags):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [idea.id])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, title, concept, tags) VALUES (%s, %s, %s, %s)',
+                [idea.id, idea.title, idea.concept, ' '.join(tags)]
+            )
+
+    def index_many(self, ideas):
+        rows = self._rows(ideas)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[row[0]] for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE}(rowid, title, concept, tags) VALUES (%s, %s, %s, %s)', rows
+            )
+
+    def remove(self, idea_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [idea_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, terms, limit, offset=0):
+        # every term is quoted so that nothing in the query is parsed as FTS syntax. Only the last one
+        # is a prefix query(`*`), the doclists of prefixes longer than the prefix indexes are merged
+        # in memory, which costs as much as all the ideas containing them.
+        match = ' '.join([*(f'"{term}"' for term in terms[:-1]), f'"{terms[-1]}"*'])
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in ('title', 'concept', 'tags'))
+        # every match is ranked, sqlite keeps only the best `limit + offset` of them while sorting
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY rank DESC, rowid DESC LIMIT %s OFFSET %s',
+                [match, limit, offset]
+            )
+            return [SearchResult(idea_id, rank) for idea_id, rank in cursor.fetchall()]
+
+
+class InvertedIndexBackend(SearchBackend):
+    """Search through the words of the ideas stored in `IdeaSearchTerm`, works on every database"""
+    @property
+    def model(self):
+        return apps.get_model('ideas', 'IdeaSearchTerm')
+
+    def _terms(self, idea, tags):
+        weights = Counter()
+        for field, text in (('title', idea.title), ('concept', idea.concept), ('tags', ' '.join(tags))):
+            for term in set(tokenize(text)):
+                weights[term] += FIELD_WEIGHTS[field]
+        return [self.model(idea_id=idea.id, term=term, weight=weight) for term, weight in weights.items()]
+
+    def index(self, idea, tags):
+        self.model.objects.filter(idea_id=idea.id).delete()
+        self.model.objects.bulk_create(self._terms(idea, tags))
+
+    def index_many(self, ideas):
+        ideas = list(ideas)
+        self.model.objects.filter(idea__in=ideas).delete()
+        self.model.objects.bulk_create(
+            [term for idea in ideas for term in self._terms(idea, [tag.name for tag in idea.tags.all()])],
+            batch_size=1000
+        )
+
+    def remove(self, idea_id):
+        self.model.objects.filter(idea_id=idea_id).delete()
+
+    def clear(self):
+        self.model.objects.all().delete()
+
+    def search(self, terms, limit, offset=0):
+        matches = {f'match_{index}': Q(term=term) for index, term in enumerate(terms[:-1])}
+        matches[f'match_{len(terms) - 1}'] = Q(term__startswith=terms[-1])
+        rows = (
+            self.model.objects
+            .filter(reduce(or_, matches.values()))
+            .values('idea')
+            .annotate(rank=Sum('weight'), **{name: Count('id', filter=q) for name, q in matches.items()})
+            # every term must match a word of the idea
+            .filter(**{f'{name}__gt': 0 for name in matches})
+            .order_by('-rank', '-idea')
+            .values_list('idea', 'rank')[offset:offset + limit]
+        )
+        return [SearchResult(idea_id, rank) for idea_id, rank in rows]
+
+
+def has_fts_table():
+    global _has_fts_table
+    if _has_fts_table is None:
+        _has_fts_table = FTS_TABLE in connection.introspection.table_names()
+    return _has_fts_table
+
+
+def get_backend():
+    """
+    Returns
+        SearchBackend: the one set by `IDEA_SEARCH_BACKEND`, else FTS5 when the table
+            was created by the migrations, else the inverted index.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'IDEA_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'sqlite' and has_fts_table():
+            _backend = SqliteFTSBackend()
+        else:
+            _backend = InvertedIndexBackend()
+    return _backend
+
+
+def index_idea(idea, tags=None):
+    """Add the idea to the index, its tags are fetched when not passed"""
+    if tags is None:
+        tags = idea.tags.names()
+    get_backend().index(idea, list(tags))
+
+
+def remove_idea(idea_id):
+    get_backend().remove(idea_id)
+
+
+def search(ideas, query, limit=SEARCH_RESULTS_LIMIT):
+    """
+    Returns
+        list: at most `limit` of the ideas matching the query, the best match first. Each of them has the attributes
+            `search_rank` and `search_snippet`, the concept with the matches highlighted.
+
+    The index holds every idea, those left out by `ideas`(e.g. the private ones) are skipped once fetched
+    and more matches are looked up until there are `limit` ideas, twice as many each time.
+
+    Args
+        ideas: IdeaQuerySet or IdeaManager
+            The ideas to search within, e.g. only the public ones. The matches are fetched with its `get_by_ids`.
+        query: str
+            The words that the ideas must contain, the last of them may be the start of a word.
+        limit: int
+            The maximum number of ideas returned.
+    """
+    terms = tokenize(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+    backend = get_backend()
+    matches = []
+    offset = 0
+    size = limit
+    while len(matches) < limit:
+        results = backend.search(terms, size, offset)
+        matched = ideas.get_by_ids([result.id for result in results])
+        for result in results:
+            idea = matched.get(result.id)
+            # e.g. the idea is private
+            if idea is None:
+                continue
+            idea.search_rank = result.rank
+            # only the snippets of the ideas of the page shown are built
+            idea.search_snippet = SimpleLazyObject(partial(highlight, idea.concept, terms))
+            matches.append(idea)
+        if len(results) < size:
+            break
+        offset += size
+        size *= 2
+    return matches[:limit]
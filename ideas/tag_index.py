@@ -0,0 +1,222 @@
+"""
+In memory index of the names of the tags used for their autocompletion.
+
+Every process keeps its own index and builds it again when the version stored in the cache changes,
+which happens only when a tag is saved or deleted(see ideas.models). The counts of the tags change
+far more often, as the tags of the ideas change, and are refreshed in place: the process loads the
+counts again at most once every `TAG_INDEX_COUNTS_SECONDS` after they changed, the index is not rebuilt.
+The rows and the counts are cached along with their versions, so that after a change only the
+first process that needs them queries the database.
+"""
+import threading
+import time
+import uuid
+from collections import defaultdict
+from heapq import nlargest
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.functions import Coalesce
+from taggit.models import Tag
+
+VERSION_KEY = 'tag_index:version'
+ROWS_KEY = 'tag_index:rows:{version}'
+COUNTS_VERSION_KEY = 'tag_index:counts_version'
+COUNTS_KEY = 'tag_index:counts:{version}'
+# names are indexed by their substrings of up to this length
+MAX_GRAM_LENGTH = 3
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_cache():
+    return caches['querysets']
+
+
+def get_grams(text):
+    """
+    Returns
+        set: the substrings of the text of the length `MAX_GRAM_LENGTH`, or the text itself if it is shorter.
+    """
+    length = min(len(text), MAX_GRAM_LENGTH)
+    return {text[start:start + length] for start in range(len(text) - length + 1)}
+
+
+class TagIndex:
+    """
+    Maps every substring of up to 3 characters of the lowercased names of the tags to
+    the positions of the tags containing it, the tags being in the order of their names.
+    The most used tags are picked among the matches while searching, hence their counts
+    can change without building the index again.
+
+    Args
+        rows: list
+            (id, name, slug, count) of every tag, count being the number of times it is used.
+        version: str
+            The version of the rows in the cache.
+        counts_version: str
+            The version of the counts in the cache.
+    """
+    def __init__(self, rows, version=None, counts_version=None):
+        self.rows = sorted(rows, key=lambda row: row[1].lower())
+        self.names = [row[1].lower() for row in self.rows]
+        self.positions = {row[0]: position for position, row in enumerate(self.rows)}
+        # the counts of the tags along with the positions of the most used tags of all by the limit,
+        # replaced together as the counts change
+        self.ranking = ([row[3] for row in self.rows], {})
+        self.version = version
+        self.counts_version = counts_version
+        self.counted_at = time.monotonic()
+        self.grams = defaultdict(list)
+        for position, name in enumerate(self.names):
+            grams = {
+                name[start:start + length]
+                for length in range(1, MAX_GRAM_LENGTH + 1)
+                for start in range(len(name) - length + 1)
+            }
+            for gram in grams:
+                self.grams[gram].append(position)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def update_counts(self, counts, counts_version=None):
+        """
+        Set the counts of the tags, those missing are taken to be unused.
+
+        Args
+            counts: list
+                (id, count) of the tags.
+            counts_version: str
+                The version of the counts in the cache.
+        """
+        updated = [0] * len(self.rows)
+        for tag_id, count in counts:
+            position = self.positions.get(tag_id)
+            if position is not None:
+                updated[position] = count
+        self.ranking = (updated, {})
+        self.counts_version = counts_version
+        self.counted_at = time.monotonic()
+
+    def search(self, query, limit):
+        """
+        Returns
+            list: `Tag` of at most `limit` of the most used tags whose names contain the query, ignoring the case.
+        """
+        query = query.lower()
+        counts, top = self.ranking
+        if not query:
+            if limit not in top:
+                top[limit] = nlargest(limit, range(len(self.rows)), key=counts.__getitem__)
+            return self.get_tags(top[limit])
+        if len(query) <= MAX_GRAM_LENGTH:
+            # every tag with the query as a gram contains it
+            positions = self.grams.get(query, ())
+        else:
+            postings = [self.grams.get(gram, ()) for gram in get_grams(query)]
+            positions = [position for position in min(postings, key=len) if query in self.names[position]]
+
+        # the positions are in the order of the names, which breaks the ties
+        return self.get_tags(nlargest(limit, positions, key=counts.__getitem__))
+
+    def get_tags(self, positions):
+        """Returns list: `Tag` at the positions"""
+        tags = []
+        for position in positions:
+            tag_id, name, slug, __ = self.rows[position]
+            tags.append(Tag(id=tag_id, name=name, slug=slug))
+        return tags
+
+
+def get_rows():
+    """
+    Returns
+        list: (id, name, slug, count) of every tag, count being the number of ideas tagged with it(see TagStats).
+    """
+    tags = Tag.objects.annotate(count=Coalesce('stats__count', 0))
+    return list(tags.values_list('id', 'name', 'slug', 'count'))
+
+
+def get_counts():
+    """
+    Returns
+        list: (id, count) of the tags tagging any idea(see TagStats).
+    """
+    return list(apps.get_model('ideas', 'TagStats').objects.values_list('tag_id', 'count'))
+
+
+def _get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_version():
+    """Returns the current version of the index, starting a new one when the cache doesn't have it"""
+    return _get_version(VERSION_KEY)
+
+
+def get_counts_version():
+    """Returns the current version of the counts of the tags, starting a new one when the cache doesn't have it"""
+    return _get_version(COUNTS_VERSION_KEY)
+
+
+def invalidate():
+    """
+    Make every process build the index again before it is used next, call it once the changes
+    to the tags themselves are committed.
+    """
+    get_cache().set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_counts():
+    """Make every process load the counts of the tags again, call it once the changes to the counts are committed"""
+    get_cache().set(COUNTS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _get_cached(key, load):
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        cache.set(key, value)
+    return value
+
+
+def get_index():
+    """
+    Returns
+        TagIndex: of the current version, built from the cached rows or the database if it is outdated.
+            Its counts are refreshed when they changed, at most once every `TAG_INDEX_COUNTS_SECONDS`.
+    """
+    global _index
+    version = get_version()
+    index = _index
+    if index is not None and index.version == version:
+        if time.monotonic() - index.counted_at < settings.TAG_INDEX_COUNTS_SECONDS:
+            return index
+        counts_version = get_counts_version()
+        if index.counts_version == counts_version:
+            index.counted_at = time.monotonic()
+            return index
+        with _lock:
+            if _index is index and index.counts_version != counts_version:
+                index.update_counts(_get_cached(COUNTS_KEY.format(version=counts_version), get_counts), counts_version)
+        return index
+
+    with _lock:
+        if _index is not None and _index.version == version:
+            return _index
+        # the rows are cached with the version of the counts they were loaded at,
+        # the counts changed since are loaded with the next refresh
+        counts_version, rows = _get_cached(
+            ROWS_KEY.format(version=version), lambda: (get_counts_version(), get_rows())
+        )
+        _index = TagIndex(rows, version=version, counts_version=counts_version)
+        return _index
@@ -1,3 +1,18 @@
+from importlib import import_module
+from io import StringIO
+from unittest.mock import call, patch
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import override_settings
+from django.utils import timezone
+
+from flag.models import Flag
+from ideas import search, tag_index, view_counts
+from ideas.extractor import TLDS_DIR, get_extractor
+from ideas.models import Idea, IdeaSearchTerm, PendingViews, TagStats
+from ideas.utils import base36_encode, get_hot_score, get_idea_slug, is_idea_slug
 from tests.base import TestBase
 
 
@@ -72,6 +87,439 @@ class IdeaModelTest(TestBase):
         # We can't exactly test the exact url since there are random characters added to the slug
         self.assertEqual(idea.slug in idea.get_absolute_url(), True)
 
+    def test_slug(self):
+        """Test the slug is the slugified title with the id of the idea in base 36"""
+        ideas = [self.create_idea(title='Same Title', concept='concept') for __ in range(2)]
+        for idea in ideas:
+            self.assertEqual(idea.slug, f'same-title-{base36_encode(idea.id)}')
+            self.assertEqual(Idea.objects.get(id=idea.id).slug, idea.slug)
+
+        idea = ideas[0]
+        idea.title = 'New title'
+        idea.save()
+        self.assertEqual(Idea.objects.get(id=idea.id).slug, f'same-title-{base36_encode(idea.id)}')
+
+    def test_slug_max_length(self):
+        idea = self.create_idea(title='long ' * 20, concept='concept')
+        self.assertLessEqual(len(idea.slug), 80)
+        self.assertTrue(idea.slug.endswith(f'-{base36_encode(idea.id)}'))
+        self.assertNotIn('--', idea.slug)
+        self.assertEqual(get_idea_slug('!!!', 1295, 80), 'zz')
+
+    def test_is_idea_slug(self):
+        self.assertTrue(is_idea_slug('same-title-zz', 1295))
+        self.assertTrue(is_idea_slug('zz', 1295))
+        self.assertFalse(is_idea_slug('same-title-zz-abcd', 1295))
+        self.assertFalse(is_idea_slug('same-title-zzz', 1295))
+
+    def test_derive_slugs_of_legacy_ideas(self):
+        derive_slugs = import_module('ideas.migrations.0015_idea_legacy_slug').derive_slugs
+        first, second = [self.create_idea(title='My idea', concept='concept') for __ in range(2)]
+        # the random slug of the first idea is the one derived for the second
+        Idea.objects.filter(id=second.id).update(slug='my-idea-x_k-')
+        Idea.objects.filter(id=first.id).update(slug=second.slug)
+        Idea.objects.filter(id=self.anonymous_idea.id).update(slug='')
+
+        derive_slugs(apps, None)
+        derive_slugs(apps, None)
+        ideas = Idea.objects.filter(id__in=[self.anonymous_idea.id, first.id, second.id]).order_by('id')
+        self.assertEqual(
+            list(ideas.values_list('slug', 'legacy_slug')),
+            [(self.anonymous_idea.slug, None), (first.slug, second.slug), (second.slug, 'my-idea-x_k-')]
+        )
+
+    def test_base36_encode(self):
+        self.assertEqual(
+            [base36_encode(number) for number in (0, 9, 10, 35, 36, 1295)], ['0', '9', 'a', 'z', '10', 'zz']
+        )
+
+    def test_concept_html(self):
+        """Test the concept is stored as it is and its links are rendered as escaped html"""
+        concept = 'Visit example.com or <b>https://www.example.org/path?a=1&b=2</b>'
+        idea = self.create_idea(title='Links', concept=concept)
+        self.assertEqual(idea.concept, concept)
+        self.assertEqual(
+            idea.concept_html,
+            'Visit <a href="http://example.com" rel="nofollow noopener">example.com</a> or &lt;b&gt;'
+            '<a href="https://www.example.org/path?a=1&amp;b=2" rel="nofollow noopener">'
+            'https://www.example.org/path?a=1&amp;b=2</a>&lt;/b&gt;'
+        )
+
+    def test_concept_html_is_same_on_resaving(self):
+        """Test repeated saves don't wrap the links again"""
+        idea = self.create_idea(title='Links', concept='Visit example.com and example.com')
+        concept_html = idea.concept_html
+        for __ in range(2):
+            idea = Idea.objects.get(id=idea.id)
+            idea.title = 'Edited'
+            idea.save()
+        self.assertEqual(idea.concept, 'Visit example.com and example.com')
+        self.assertEqual(idea.concept_html, concept_html)
+        self.assertEqual(idea.concept_html.count('<a '), 2)
+
+        idea.concept = 'No links now'
+        idea.save()
+        self.assertEqual(Idea.objects.get(id=idea.id).concept_html, 'No links now')
+
     def test_meta_data_for_seo(self):
         """Test meta-information about the model that will be used for SEO functionalities"""
         pass
+
+
+class TestExtractor(TestBase):
+    def test_extractor_is_shared(self):
+        self.assertIs(get_extractor(), get_extractor())
+
+    @patch('urllib.request.urlopen')
+    def test_extractor_never_downloads_tlds(self, mocked_urlopen):
+        extractor = get_extractor()
+        self.assertEqual(extractor._tld_list_path.startswith(TLDS_DIR), True)
+        self.assertEqual(extractor.update(), False)
+        mocked_urlopen.assert_not_called()
+        self.assertEqual(extractor.find_urls('Visit example.com'), ['example.com'])
+
+
+class TestSearch(TestBase):
+    """Run the same searches over the FTS5 table and the inverted index"""
+    backends = [search.SqliteFTSBackend, search.InvertedIndexBackend]
+
+    def create_ideas(self):
+        self.gardening = self.create_idea(title='Community gardening', concept='Grow vegetables on rooftops')
+        self.garden = self.create_idea(title='Rooftop farms', concept='Turn every garden into <b>food</b>')
+        self.garden.tags.add('farming')
+        self.private = self.create_idea(
+            title='Private garden', concept='Only for me', user=self.user, visibility=False
+        )
+
+    def search(self, query):
+        return Idea.public_objects.search(query)
+
+    def test_search(self):
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__), patch.object(search, '_backend', backend()):
+                self.create_ideas()
+                # prefix matches, the match in the title ranks first, private ideas are left out
+                self.assertEqual(self.search('gard'), [self.gardening, self.garden])
+                # every word must match, in any of the fields
+                self.assertEqual(self.search('rooftop farm'), [self.garden])
+                self.assertEqual(self.search('FARMING'), [self.garden])
+                self.assertEqual(self.search('gardening cabbage'), [])
+                # query syntax is ignored
+                self.assertEqual(self.search('"garden* OR -( NEAR'), [])
+                self.assertEqual(self.search('*** ""'), [])
+
+                snippet = self.search('garden')[1].search_snippet
+                self.assertIn('<mark>garden</mark>', snippet)
+                self.assertIn('&lt;b&gt;food', snippet)
+
+                self.garden.title = 'Rooftop orchards'
+                self.garden.save()
+                self.garden.tags.clear()
+                self.assertEqual(self.search('farm'), [])
+
+                self.gardening.delete()
+                self.assertEqual(self.search('community'), [])
+                Idea.objects.all().delete()
+
+    def test_search_fetches_public_ideas_by_id(self):
+        self.create_ideas()
+        Idea.objects.filter(id=self.gardening.id).update(flag_state=Flag.State.FLAGGED)
+        # the matches, the conceivers are joined
+        with self.assertNumQueries(2):
+            self.assertEqual(self.search('garden'), [self.gardening, self.garden])
+        with self.settings(HIDE_FLAGGED_CONTENT=True):
+            self.assertEqual(self.search('garden'), [self.garden])
+        # the other querysets are filtered by the database
+        self.assertEqual(Idea.objects.filter(user=self.user).search('garden'), [self.private])
+
+    def test_search_looks_up_more_matches_than_the_private_ones(self):
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__), patch.object(search, '_backend', backend()):
+                self.create_ideas()
+                for __ in range(3):
+                    self.create_idea(title='Garden', concept='Garden', user=self.user, visibility=False)
+                # the 4 private matches rank first, 1 then 2 then 4 matches are looked up
+                with self.assertNumQueries(6):
+                    self.assertEqual(Idea.public_objects.search('garden', limit=1), [self.gardening])
+                self.assertEqual(Idea.public_objects.search('garden', limit=2), [self.gardening, self.garden])
+                self.assertEqual(Idea.public_objects.search('garden', limit=10), [self.gardening, self.garden])
+                Idea.objects.all().delete()
+
+    def test_rebuild_search_index(self):
+        for backend in self.backends:
+            with self.subTest(backend=backend.__name__), patch.object(search, '_backend', backend()):
+                self.create_ideas()
+                search.get_backend().clear()
+                self.assertEqual(self.search('garden'), [])
+
+                call_command('rebuild_search_index', stdout=StringIO())
+                self.assertEqual(self.search('farming'), [self.garden])
+                Idea.objects.all().delete()
+
+    def test_inverted_index_weights(self):
+        with patch.object(search, '_backend', search.InvertedIndexBackend()):
+            self.create_ideas()
+        weights = dict(IdeaSearchTerm.objects.filter(idea=self.garden).values_list('term', 'weight'))
+        self.assertEqual(weights['rooftop'], search.FIELD_WEIGHTS['title'])
+        self.assertEqual(weights['garden'], search.FIELD_WEIGHTS['concept'])
+        self.assertEqual(weights['farming'], search.FIELD_WEIGHTS['tags'])
+
+    def test_highlight(self):
+        snippet = search.highlight('Plant a <tree> in the Gardens of the city', ['garden', 'tree'], words=5)
+        self.assertEqual(snippet, '…a &lt;<mark>tree</mark>&gt; in the <mark>Gardens</mark>…')
+
+
+class TestTagIndex(TestBase):
+    def test_search(self):
+        index = tag_index.TagIndex([
+            (1, 'Python', 'python', 3), (2, 'Django', 'django', 5), (3, 'pythonic', 'pythonic', 1), (4, 'go', 'go', 0)
+        ])
+        search = lambda query, limit=10: [tag.name for tag in index.search(query, limit)]  # noqa: E731
+
+        self.assertEqual(search(''), ['Django', 'Python', 'pythonic', 'go'])
+        self.assertEqual(search('O'), ['Django', 'Python', 'pythonic', 'go'])
+        self.assertEqual(search('py'), ['Python', 'pythonic'])
+        self.assertEqual(search('thoni'), ['pythonic'])
+        self.assertEqual(search('on', limit=1), ['Python'])
+        self.assertEqual(search('pythons'), [])
+        self.assertEqual(index.search('dj', 1)[0].pk, 2)
+
+    def test_invalidate_on_tags_change(self):
+        idea = self.create_idea(title='Tagged idea', concept='Its tags are indexed')
+        with patch('ideas.models.transaction.on_commit') as on_commit:
+            idea.tags.add('python')
+        # the new tag is indexed
+        on_commit.assert_any_call(tag_index.invalidate)
+        on_commit.assert_any_call(tag_index.invalidate_counts)
+
+        other_idea = self.create_idea(title='Another idea', concept='Tagged the same')
+        with patch('ideas.models.transaction.on_commit') as on_commit:
+            other_idea.tags.add('python')
+        # only the counts of the tags changed
+        self.assertNotIn(call(tag_index.invalidate), on_commit.call_args_list)
+        on_commit.assert_any_call(tag_index.invalidate_counts)
+
+    @override_settings(TAG_INDEX_COUNTS_SECONDS=0)
+    def test_counts_are_refreshed_without_building_the_index_again(self):
+        self.create_idea(title='Tagged idea', concept='Its tags are indexed').tags.add('go', 'python')
+        self.create_idea(title='Another idea', concept='Tagged the same').tags.add('go')
+        tag_index.invalidate()
+        index = tag_index.get_index()
+        self.assertEqual([tag.name for tag in index.search('o', 10)], ['go', 'python'])
+
+        for idea in Idea.objects.all():
+            idea.tags.add('python')
+        self.create_idea(title='Third idea', concept='Tagged with python').tags.add('python')
+        tag_index.invalidate_counts()
+        with self.assertNumQueries(1):
+            self.assertIs(tag_index.get_index(), index)
+        self.assertEqual([tag.name for tag in index.search('o', 10)], ['python', 'go'])
+        # the counts are loaded from the cache by the other processes
+        index.counts_version = None
+        with self.assertNumQueries(0):
+            tag_index.get_index()
+        self.assertEqual(index.search('o', 1)[0].name, 'python')
+
+    def test_index_is_shared_through_the_cache(self):
+        tag_index.invalidate()
+        self.create_idea(title='Tagged idea', concept='Its tags are indexed').tags.add('python')
+        index = tag_index.get_index()
+        self.assertEqual(len(index), 1)
+        # another process finds the rows in the cache
+        with patch.object(tag_index, '_index', None), self.assertNumQueries(0):
+            self.assertEqual(len(tag_index.get_index()), 1)
+
+
+class TestTagStats(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.idea = self.create_idea(title='Recent idea', concept='Created just now')
+        self.old_idea = self.create_idea(
+            title='Old idea', concept='Created 3 days ago', date_created=timezone.now() - timezone.timedelta(days=3)
+        )
+
+    def get_counts(self):
+        return {
+            stats.tag.name: (stats.count, stats.count_week, stats.count_day)
+            for stats in TagStats.objects.select_related('tag')
+        }
+
+    def test_counts_follow_tags(self):
+        self.idea.tags.add('python', 'django')
+        self.old_idea.tags.add('python')
+        self.assertEqual(self.get_counts(), {'python': (2, 2, 1), 'django': (1, 1, 1)})
+
+        self.idea.tags.remove('python')
+        self.assertEqual(self.get_counts(), {'python': (1, 1, 0), 'django': (1, 1, 1)})
+
+        self.idea.tags.clear()
+        self.assertEqual(self.get_counts(), {'python': (1, 1, 0), 'django': (0, 0, 0)})
+
+        self.old_idea.delete()
+        self.assertEqual(self.get_counts(), {'python': (0, 0, 0), 'django': (0, 0, 0)})
+
+    def test_update_counts_num_queries(self):
+        self.idea.tags.add('python')
+        tag_ids = list(self.idea.tags.values_list('id', flat=True))
+        with self.assertNumQueries(1):
+            TagStats.objects.update_counts(tag_ids, -1, self.idea.date_created)
+
+    def test_rebuild(self):
+        self.idea.tags.add('python', 'django')
+        self.old_idea.tags.add('python')
+        counts = self.get_counts()
+        TagStats.objects.all().delete()
+
+        call_command('rebuild_tag_stats', stdout=StringIO())
+        self.assertEqual(self.get_counts(), counts)
+
+        # the idea is no longer within the last day
+        Idea.objects.filter(id=self.idea.id).update(date_created=timezone.now() - timezone.timedelta(days=2))
+        TagStats.objects.rebuild()
+        self.assertEqual(self.get_counts(), {'python': (2, 2, 0), 'django': (1, 1, 0)})
+
+    def test_trending(self):
+        self.idea.tags.add('python', 'django')
+        self.old_idea.tags.add('python', 'go')
+
+        def trending(period):
+            return [stats.tag.name for stats in TagStats.objects.trending(period)]
+
+        self.assertEqual(trending('day'), ['python', 'django'])
+        self.assertEqual(trending('all'), ['python', 'django', 'go'])
+
+
+class TestViewCounts(TestBase):
+    def setUp(self):
+        super().setUp()
+        view_counts.write_views()
+        PendingViews.objects.all().delete()
+        self.ideas = [self.create_idea(title=f'Idea {index}', concept='Viewed') for index in range(2)]
+
+    def record_views(self, idea, views):
+        for __ in range(views):
+            view_counts.record_view(idea.id)
+
+    def flush(self):
+        out = StringIO()
+        call_command('flush_idea_views', stdout=out)
+        return out.getvalue()
+
+    def get_views(self):
+        return list(Idea.objects.filter(id__in=[idea.id for idea in self.ideas]).order_by('id').values_list(
+            'views', flat=True
+        ))
+
+    def test_flush_views(self):
+        with self.assertNumQueries(0):
+            self.record_views(self.ideas[0], 3)
+        self.record_views(self.ideas[1], 1)
+        # the views haven't been written by the process yet
+        self.flush()
+        self.assertEqual(self.get_views(), [0, 0])
+
+        # the insert, within a savepoint as the test runs in a transaction
+        with self.assertNumQueries(3):
+            self.assertEqual(view_counts.write_views(), 4)
+        self.assertEqual(self.flush().strip(), '4 views of 2 ideas flushed')
+        self.assertEqual(self.get_views(), [3, 1])
+        # the views are added only once
+        self.flush()
+        self.assertEqual(self.get_views(), [3, 1])
+
+        self.record_views(self.ideas[0], 2)
+        view_counts.write_views()
+        self.record_views(self.ideas[0], 1)
+        view_counts.write_views()
+        self.flush()
+        self.assertEqual(self.get_views(), [6, 1])
+        self.assertFalse(PendingViews.objects.exists())
+
+    @override_settings(IDEA_VIEWS_BUFFER_SECONDS=0)
+    def test_views_are_written_by_a_thread(self):
+        with patch.object(view_counts, '_writer_pid', None), patch('threading.Thread') as thread:
+            with self.assertNumQueries(0):
+                self.record_views(self.ideas[0], 2)
+            # a single thread is started by the process
+            thread.assert_called_once_with(
+                target=view_counts._write_periodically, name='idea-views-writer', daemon=True
+            )
+
+        # the thread sleeps, then writes the views
+        with patch('time.sleep', side_effect=[None, KeyboardInterrupt]), \
+                patch.object(view_counts, 'close_old_connections'), self.assertRaises(KeyboardInterrupt):
+            view_counts._write_periodically()
+        self.assertEqual(list(PendingViews.objects.values_list('idea_id', 'views')), [(self.ideas[0].id, 2)])
+
+    def test_failed_write_keeps_the_views(self):
+        self.record_views(self.ideas[0], 2)
+        with patch.object(PendingViews.objects, 'bulk_create', side_effect=DatabaseError):
+            self.assertEqual(view_counts.write_views(), 0)
+        self.assertEqual(view_counts.write_views(), 2)
+
+    def test_flush_skips_claimed_views(self):
+        self.record_views(self.ideas[0], 1)
+        view_counts.write_views()
+        # claimed by another flush
+        PendingViews.objects.update(claim='other')
+        self.record_views(self.ideas[1], 1)
+        view_counts.write_views()
+        self.flush()
+        self.assertEqual(self.get_views(), [0, 1])
+
+    def test_add_views_num_queries(self):
+        with self.assertNumQueries(1):
+            Idea.objects.add_views({self.ideas[0].id: 2, self.ideas[1].id: 5})
+        self.assertEqual(self.get_views(), [2, 5])
+
+
+class TestHotScore(TestBase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.idea = self.create_idea(title='Recent idea', concept='Hot', date_created=now)
+        self.old_idea = self.create_idea(
+            title='Old idea', concept='Cold', date_created=now - timezone.timedelta(days=1)
+        )
+
+    def test_hot_score(self):
+        self.assertGreater(self.idea.hot_score, self.old_idea.hot_score)
+        self.assertEqual(self.idea.hot_score, get_hot_score(0, 0, self.idea.date_created))
+        # a hundred times the views of an idea a day newer
+        self.assertGreater(get_hot_score(101, 0, self.old_idea.date_created), self.idea.hot_score)
+        flagged = get_hot_score(101, 1, self.old_idea.date_created)
+        self.assertLess(flagged, get_hot_score(101, 0, self.old_idea.date_created))
+
+    def test_update_hot_scores(self):
+        Idea.objects.add_views({self.old_idea.id: 1000})
+        # only the scores that have changed are written
+        with self.assertNumQueries(2):
+            self.assertEqual(Idea.objects.update_hot_scores(), 1)
+        self.assertEqual(Idea.objects.update_hot_scores(), 0)
+        self.assertEqual(
+            list(Idea.objects.order_by('-hot_score').values_list('id', flat=True)), [self.old_idea.id, self.idea.id]
+        )
+
+    def test_saving_keeps_the_counts_changed_since_loaded(self):
+        stale = Idea.objects.get(id=self.old_idea.id)
+        Idea.objects.add_views({self.old_idea.id: 1000})
+        Idea.objects.update_hot_scores()
+        Idea.objects.filter(id=self.old_idea.id).update(flag_state=Flag.State.FLAGGED, flag_count=3)
+        stale.title = 'Older idea'
+        stale.save()
+        idea = Idea.objects.get(id=self.old_idea.id)
+        self.assertEqual(idea.title, 'Older idea')
+        self.assertEqual(
+            (idea.views, idea.flag_state, idea.flag_count, idea.hot_score),
+            (1000, Flag.State.FLAGGED, 3, get_hot_score(1000, 0, idea.date_created))
+        )
+
+    def test_update_hot_scores_command(self):
+        Idea.objects.add_views({self.idea.id: 10, self.old_idea.id: 10})
+        Idea.objects.filter(id=self.old_idea.id).update(date_created=timezone.now() - timezone.timedelta(days=30))
+        out = StringIO()
+        call_command('update_hot_scores', stdout=out)
+        # the old idea is out of the window
+        self.assertEqual(out.getvalue().strip(), '1 ideas scored')
+        call_command('update_hot_scores', '--all', stdout=out)
+        self.assertEqual(out.getvalue().split('\n')[1], '1 ideas scored')
@@ -2,10 +2,18 @@ from unittest.mock import patch
 
 import feedparser
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import connection
 from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import urlencode
+from taggit.models import Tag
 
-from ideas.models import Idea
+from ideas import tag_index, view_counts
+from ideas.models import Idea, get_idea_card_key, get_tagged_idea_ids
 from ideas.tests.base import TestIdeaBase
+from subscribers.models import Subscriber
 from tests.base import TestBase
 
 
@@ -90,6 +98,8 @@ class TestSubscription(TestBase):
         self.assertEqual(response['status'], 0)
         self.assertEqual('not' in response['msg'], False)
         self.assertEqual('success' in response['msg'], True)
+        # the domain is verified later on
+        self.assertEqual(Subscriber.objects.get(email=self.email).state, Subscriber.State.PENDING)
 
     @patch('utils.validators.is_email_valid')
     def test_subscription_integrity(self, mocked_attr):
@@ -141,6 +151,128 @@ class TestHomeView(TestIdeaBase):
         [self.assertEqual(idea.visibility, True)
          for idea in response.context['ideas']]
 
+    def test_home_view_num_queries(self):
+        """Test conceivers and tags are loaded in batches instead of once per idea"""
+        # user, count, ideas with their conceivers and tags of all ideas
+        with self.assertNumQueries(4):
+            response = self.client.get(self.get_url())
+        self.assertEqual(len(response.context['ideas']), 15)
+
+    def test_home_view_idea_card_cache(self):
+        """Test cards are cached and invalidated on change of tags, update and deletion"""
+        cache = caches['fragments']
+        idea = Idea.public_objects.first()
+        key = get_idea_card_key(idea)
+        cache.delete(key)
+
+        self.client.get(self.get_url())
+        self.assertIn(idea.title, cache.get(key))
+
+        idea.tags.add('cached')
+        self.assertIsNone(cache.get(key))
+        response = self.client.get(self.get_url())
+        self.assertContains(response, 'cached')
+
+        idea.title = 'new title'
+        idea.save()
+        self.assertIsNone(cache.get(key))
+        key = get_idea_card_key(idea)
+        response = self.client.get(self.get_url())
+        self.assertIn('new title', cache.get(key))
+
+        idea.delete()
+        self.assertIsNone(cache.get(key))
+
+    def test_home_view_idea_card_cache_on_conceiver_change(self):
+        """Test cards are invalidated when their conceiver is renamed"""
+        cache = caches['fragments']
+        idea = Idea.public_objects.filter(user__isnull=False).first()
+        key = get_idea_card_key(idea)
+        self.client.get(self.get_url())
+        self.assertIsNotNone(cache.get(key))
+
+        # e.g. logging in
+        with self.capture_on_commit_callbacks(execute=True):
+            idea.user.save(update_fields=['last_login'])
+        self.assertIsNotNone(cache.get(key))
+
+        idea.user.first_name = 'Renamed'
+        # the ideas of the user and their tags
+        with self.assertNumQueries(3), self.capture_on_commit_callbacks(execute=True):
+            idea.user.save()
+        self.assertIsNone(cache.get(key))
+        self.assertContains(self.client.get(self.get_url()), 'Renamed')
+
+    def test_home_view_conditional_get(self):
+        """Test the page isn't rendered again until an idea changes"""
+        response = self.client.get(self.get_url())
+        etag = response['ETag']
+        # only the user
+        with self.assertNumQueries(1):
+            response = self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.client.get(self.get_url(), data={'page': 2})['ETag'], etag)
+
+        with self.capture_on_commit_callbacks(execute=True):
+            Idea.objects.get(id=1).save()
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_home_view_conditional_get_for_anonymous_user(self):
+        self.client.logout()
+        response = self.client.get(self.get_url())
+        last_modified = response['Last-Modified']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.get_url(), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        # the ETag differs from the one of the logged in user
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_home_view_keyset_pagination(self):
+        """Test cursor based pagination walks through all 23 public ideas"""
+        with self.settings(KEYSET_PAGINATION=True):
+            response = self.client.get(self.get_url())
+            self.assertEqual(response.context['is_paginated'], True)
+            self.assertEqual(len(response.context['ideas']), 15)
+            page_obj = response.context['page_obj']
+            self.assertEqual(page_obj.has_previous(), False)
+            self.assertContains(response, f'?cursor={page_obj.next_cursor}')
+
+            response = self.client.get(self.get_url(), data={'cursor': page_obj.next_cursor})
+            self.assertEqual(len(response.context['ideas']), 8)
+            self.assertEqual(response.context['page_obj'].has_next(), False)
+
+            response = self.client.get(self.get_url(), data={'cursor': 'invalid'})
+            self.assertEqual(response.status_code, 404)
+
+    def test_home_view_hot_ideas(self):
+        """Test the hot ideas are ordered by their score, through both paginations"""
+        Idea.objects.add_views({3: 1_000_000, 7: 1000})
+        Idea.objects.update_hot_scores()
+        expected = list(Idea.public_objects.order_by('-hot_score', '-id').values_list('id', flat=True))
+        self.assertEqual(expected[:2], [3, 7])
+
+        response = self.client.get(self.get_url(), data={'sort': 'hot'})
+        self.assertEqual(response.context['sort'], 'hot')
+        self.assertEqual([idea.id for idea in response.context['ideas']], expected[:15])
+        self.assertContains(response, '?sort=hot&amp;page=2')
+        response = self.client.get(self.get_url(), data={'sort': 'hot', 'page': 2})
+        self.assertEqual([idea.id for idea in response.context['ideas']], expected[15:])
+
+        with self.settings(KEYSET_PAGINATION=True):
+            response = self.client.get(self.get_url(), data={'sort': 'hot'})
+            ids = [idea.id for idea in response.context['ideas']]
+            cursor = response.context['page_obj'].next_cursor
+            response = self.client.get(self.get_url(), data={'sort': 'hot', 'cursor': cursor})
+            ids += [idea.id for idea in response.context['ideas']]
+        self.assertEqual(ids, expected)
+
+        # unknown orders fall back to the latest ideas
+        response = self.client.get(self.get_url(), data={'sort': 'unknown'})
+        self.assertEqual(response.context['sort'], 'latest')
+        self.assertEqual(response.context['ideas'][0].id, 24)
+
 
 class TestAnonymousIdeaCreateView(TestIdeaBase):
     """
@@ -319,6 +451,18 @@ class TestIdeaUpdateView(TestIdeaBase):
         # Can't use assertRedirect since we are not sure about the redirected url
         self.assertEqual(response.status_code, 302)
 
+    def test_idea_update_view_fetches_idea_once(self):
+        """Test the permission check, the form and the handler share the idea"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.get_url(), data={
+                'title': 'This is an updated idea',
+                'concept': 'Unit testing suddenly, seems too much work',
+                'tags': 'update-test',
+            })
+        self.assertEqual(response.status_code, 302)
+        lookups = [query for query in context.captured_queries if '"ideas_idea"."slug" =' in query['sql']]
+        self.assertEqual(len(lookups), 1)
+
 
 class TestIdeaDeleteView(TestIdeaBase):
     """
@@ -430,6 +574,35 @@ class TestIdeaDetailView(TestIdeaBase):
         response = self.client.get(self.get_url(slug))
         self.assertTrue(response.status_code, 200)
 
+    def test_idea_detail_view_counts_views(self):
+        view_counts.write_views()
+        self.client.get(self.get_url())
+        self.client.get(self.get_url())
+        view_counts.write_views()
+        view_counts.flush_views()
+        self.assertEqual(Idea.objects.get(id=5).views, 2)
+
+    def test_private_idea_detail_view_for_other_user(self):
+        self.client.force_login(self.dummy_user)
+        response = self.client.get(self.get_url(Idea.objects.get(id=10).slug))
+        self.assertEqual(response.status_code, 403)
+
+    def test_idea_detail_view_redirects_legacy_slug(self):
+        Idea.objects.filter(id=5).update(legacy_slug='idea-number-5-x_k-')
+        response = self.client.get(self.get_url('idea-number-5-x_k-'))
+        self.assertRedirects(response, self.get_url(), status_code=301)
+        self.assertEqual(self.client.get(self.get_url('absent-slug')).status_code, 404)
+
+    def test_idea_detail_view_num_queries(self):
+        """Test the idea is fetched only once, along with its conceiver and tags"""
+        url = self.get_url()
+        # the content type is cached by the process
+        ContentType.objects.get_for_model(Idea)
+        # idea with its conceiver, its tags, the user and whether they flagged the idea
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
 
 class TestConceiverIdeaListView(TestIdeaBase):
     """
@@ -473,6 +646,28 @@ class TestConceiverIdeaListView(TestIdeaBase):
         # all private ideas are shown
         self.assertEqual(len(response.context['ideas']), 15)
 
+    def test_conceiver_idea_list_view_num_queries(self):
+        """Test conceivers and tags are loaded in batches instead of once per idea"""
+        # user, conceiver, count, ideas and tags
+        with self.assertNumQueries(5):
+            self.client.get(self.get_url())
+
+        # anonymous ideas don't need the conceiver to be fetched
+        with self.assertNumQueries(4):
+            self.client.get(self.get_url(username=AnonymousUser.username))
+
+    def test_conceiver_idea_list_view_conditional_get(self):
+        etag = self.client.get(self.get_url())['ETag']
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # anonymous ideas are listed separately
+        with self.capture_on_commit_callbacks(execute=True):
+            self.create_idea(title='Anonymous idea', concept='Not by the conceiver')
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.capture_on_commit_callbacks(execute=True):
+            self.create_idea(title='New idea', concept='By the conceiver', user=self.user)
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
     def test_conceiver_idea_list_view_for_public_idea_pagination(self):
         """Test all public ideas are shown and the view is paginated"""
         response = self.client.get(self.get_url())
@@ -482,6 +677,227 @@ class TestConceiverIdeaListView(TestIdeaBase):
         self.assertEqual(len(response.context['ideas']), 15)
 
 
+class TestTaggedIdeaListView(TestIdeaBase):
+    """
+    For TaggedIdeaListView, test
+        - url is accessible by name
+        - 404 is returned for tags that aren't present
+        - conceivers and tags are loaded in batches
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Tag ideas 4(anonymous) and 5 with tag_5"""
+        super().setUpClass()
+        for idea in Idea.objects.filter(id__in=[4, 5]):
+            idea.tags.add('tag_5', f'tag_{idea.id}')
+
+    def get_url(self, slug='tag_5'):
+        return reverse('ideas:tagged', kwargs={'slug': slug})
+
+    def test_tagged_idea_list_view_url_by_name(self):
+        response = self.client.get(self.get_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, template_name='ideas/idea_tagged.html')
+        # ideas 4 and 5 are tagged with tag_5
+        self.assertEqual(len(response.context['ideas']), 2)
+
+    def test_tagged_idea_list_view_for_absent_tag(self):
+        response = self.client.get(self.get_url(slug='absent'))
+        self.assertEqual(response.status_code, 404)
+
+    def setUp(self):
+        super().setUp()
+        caches['querysets'].clear()
+
+    def test_tagged_idea_list_view_num_queries(self):
+        # the tag, ids of its ideas, ideas of the page with their conceivers, their tags and the user
+        with self.assertNumQueries(5):
+            self.client.get(self.get_url())
+        # the ids are cached
+        with self.assertNumQueries(4):
+            self.client.get(self.get_url())
+
+    def test_tagged_idea_list_view_conditional_get(self):
+        etag = self.client.get(self.get_url())['ETag']
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # ideas with other tags don't change the listing
+        with self.capture_on_commit_callbacks(execute=True):
+            Idea.objects.get(id=7).tags.add('tag_8')
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.capture_on_commit_callbacks(execute=True):
+            Idea.objects.get(id=7).tags.add('tag_5')
+        self.assertEqual(self.client.get(self.get_url(), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_tagged_idea_list_view_for_private_idea(self):
+        Idea.objects.get(id=10).tags.add('tag_5')
+        response = self.client.get(self.get_url())
+        self.assertEqual([idea.id for idea in response.context['ideas']], [5, 4])
+
+    def test_tagged_idea_list_view_is_invalidated_once_committed(self):
+        self.client.get(self.get_url())
+        with self.capture_on_commit_callbacks() as callbacks:
+            Idea.objects.get(id=7).tags.add('tag_5')
+        # the cached listing is left as it is until the transaction is committed
+        self.assertEqual([idea.id for idea in self.client.get(self.get_url()).context['ideas']], [5, 4])
+        for callback in callbacks:
+            callback()
+        self.assertEqual([idea.id for idea in self.client.get(self.get_url()).context['ideas']], [7, 5, 4])
+
+    def test_tagged_idea_list_view_cache_invalidation(self):
+        self.client.get(self.get_url())
+        idea = Idea.objects.get(id=7)
+        with self.capture_on_commit_callbacks(execute=True):
+            idea.tags.add('tag_5')
+        self.assertEqual([idea.id for idea in self.client.get(self.get_url()).context['ideas']], [7, 5, 4])
+
+        idea.visibility = False
+        with self.capture_on_commit_callbacks(execute=True):
+            idea.save()
+        self.assertEqual(len(self.client.get(self.get_url()).context['ideas']), 2)
+
+        with self.capture_on_commit_callbacks(execute=True):
+            Idea.objects.get(id=5).delete()
+        self.assertEqual([idea.id for idea in self.client.get(self.get_url()).context['ideas']], [4])
+
+
+class TestSearchIdeaListView(TestIdeaBase):
+    """
+    For SearchIdeaListView, test
+        - only public ideas matching the query are shown, the best match first
+        - the query is kept in the links to the other pages
+        - nothing is searched for an empty query
+    """
+    def get_url(self, query=None):
+        url = reverse('ideas:search')
+        return f'{url}?q={query}' if query is not None else url
+
+    def test_search_idea_list_view_template(self):
+        response = self.client.get(self.get_url('concept idea13'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, template_name='ideas/search.html')
+        self.assertEqual(response.context['ideas'], [Idea.objects.get(id=13)])
+        self.assertContains(response, '<mark>concept</mark>')
+
+    def test_search_idea_list_view_for_private_idea(self):
+        response = self.client.get(self.get_url('idea10'))
+        self.assertEqual(len(response.context['ideas']), 0)
+
+    def test_search_idea_list_view_pagination(self):
+        # 23 ideas are public
+        response = self.client.get(self.get_url('number'))
+        self.assertEqual(response.context['is_paginated'], True)
+        self.assertEqual(len(response.context['ideas']), 15)
+        self.assertContains(response, 'href="?q=number&amp;page=2"')
+
+        response = self.client.get(self.get_url('number') + '&page=2')
+        self.assertEqual(len(response.context['ideas']), 8)
+
+    def test_search_idea_list_view_num_queries(self):
+        # user, the index, ideas with their conceivers and tags of the ideas of the page
+        with self.assertNumQueries(4):
+            self.client.get(self.get_url('number'))
+
+    def test_search_idea_list_view_for_empty_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.get_url(' '))
+        self.assertEqual(len(response.context['ideas']), 0)
+
+
+class TestTagsAutoComplete(TestIdeaBase):
+    """
+    For TagsAutoComplete, test
+        - the most used tags containing the query are returned
+        - the tags are looked up in memory
+        - responses carry an ETag that changes with the tags
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Tag 3 ideas with Python, 2 with Django and 1 with pythonic"""
+        super().setUpClass()
+        for idea in Idea.objects.filter(id__in=[1, 2, 3]):
+            idea.tags.add('Python')
+        for idea in Idea.objects.filter(id__in=[1, 2]):
+            idea.tags.add('Django')
+        Idea.objects.get(id=1).tags.add('pythonic')
+
+    def setUp(self):
+        super().setUp()
+        # the changes made while setting up are never committed
+        tag_index.invalidate()
+
+    def get_url(self, query=''):
+        return f"{reverse('ideas:tags-autocomplete')}?q={query}"
+
+    def get_names(self, response):
+        return [result['text'] for result in response.json()['results']]
+
+    def test_tags_autocomplete(self):
+        self.assertEqual(self.get_names(self.client.get(self.get_url('PYTH'))), ['Python', 'pythonic'])
+        self.assertEqual(self.get_names(self.client.get(self.get_url('ango'))), ['Django'])
+        self.assertEqual(self.get_names(self.client.get(self.get_url('o'))), ['Python', 'Django', 'pythonic'])
+        self.assertEqual(self.get_names(self.client.get(self.get_url('absent'))), [])
+
+    def test_tags_autocomplete_num_queries(self):
+        self.client.get(self.get_url('py'))
+        # the tags are looked up in memory
+        with self.assertNumQueries(0):
+            self.client.get(self.get_url('dj'))
+
+    def test_tags_autocomplete_etag(self):
+        response = self.client.get(self.get_url('py'))
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.get_url('py'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get(self.get_url('dj'))['ETag'], etag)
+
+        tag_index.invalidate()
+        response = self.client.get(self.get_url('py'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class TestTrendingTags(TestIdeaBase):
+    """
+    For trending_tags, test
+        - the most used tags of the period are returned with their counts
+        - the response is cached
+        - invalid parameters are rejected
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Tag 2 ideas with python and 1 with django"""
+        super().setUpClass()
+        for idea in Idea.objects.filter(id__in=[1, 2]):
+            idea.tags.add('python')
+        Idea.objects.get(id=1).tags.add('django')
+
+    def setUp(self):
+        super().setUp()
+        caches['querysets'].clear()
+
+    def get_url(self, **params):
+        url = reverse('ideas:trending-tags')
+        return f'{url}?{urlencode(params)}' if params else url
+
+    def test_trending_tags(self):
+        response = self.client.get(self.get_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'period': 'day', 'tags': [
+            {'name': 'python', 'slug': 'python', 'count': 2},
+            {'name': 'django', 'slug': 'django', 'count': 1},
+        ]})
+        response = self.client.get(self.get_url(period='week', limit=1))
+        self.assertEqual([tag['name'] for tag in response.json()['tags']], ['python'])
+
+    def test_trending_tags_cache(self):
+        self.client.get(self.get_url())
+        with self.assertNumQueries(0):
+            self.client.get(self.get_url(limit=1))
+
+    def test_trending_tags_bad_request(self):
+        self.assertEqual(self.client.get(self.get_url(period='year')).status_code, 400)
+        self.assertEqual(self.client.get(self.get_url(limit='all')).status_code, 400)
+
+
 class TestLatestIdeaRSSFeed(TestIdeaBase):
     """
     For LatestIdeaRSSFeed, test
@@ -548,3 +964,93 @@ class TestLatestIdeaRSSFeed(TestIdeaBase):
         feed = feedparser.parse(response.content)
         link = feed['items'][0].link
         self.assertNotEqual(link, '')
+
+    def setUp(self):
+        super().setUp()
+        caches['querysets'].clear()
+
+    def test_latest_post_rss_feed_depth(self):
+        response = self.client.get(self.get_url(), data={'depth': 5})
+        feed = feedparser.parse(response.content)
+        self.assertEqual([item.title for item in feed['items']][:2], [
+            'Anonymous Idea: idea number 24', 'Non-anonymous Idea: idea number 23'
+        ])
+        self.assertEqual(len(feed['items']), 5)
+        # invalid depths fall back to the default
+        response = self.client.get(self.get_url(), data={'depth': 'all'})
+        self.assertEqual(len(feedparser.parse(response.content)['items']), 23)
+
+    def test_latest_post_rss_feed_is_cached(self):
+        self.client.logout()
+        content = self.client.get(self.get_url()).content
+        with self.assertNumQueries(0):
+            response = self.client.get(self.get_url())
+        self.assertEqual(response.content, content)
+
+        Idea.objects.filter(id=24).update(title='new title')
+        with self.capture_on_commit_callbacks(execute=True):
+            Idea.objects.get(id=24).save()
+        feed = feedparser.parse(self.client.get(self.get_url()).content)
+        self.assertEqual(feed['items'][0].title, 'new title')
+
+    def test_latest_post_rss_feed_conditional_get(self):
+        self.client.logout()
+        last_modified = self.client.get(self.get_url())['Last-Modified']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.get_url(), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class TestTaggedIdeaRSSFeed(TestIdeaBase):
+    def get_url(self, slug='tag_5'):
+        return reverse('ideas:tagged-rss-feed', kwargs={'slug': slug})
+
+    def setUp(self):
+        super().setUp()
+        caches['querysets'].clear()
+
+    def test_tagged_idea_rss_feed(self):
+        # idea 10 is private
+        for idea in Idea.objects.filter(id__in=[4, 5, 10]):
+            idea.tags.add('tag_5')
+        feed = feedparser.parse(self.client.get(self.get_url()).content)
+        self.assertEqual(feed['bozo'], 0)
+        self.assertEqual([item.title for item in feed['items']], [
+            'Non-anonymous Idea: idea number 5', 'Anonymous Idea: idea number 4'
+        ])
+        self.assertEqual(feed['items'][1].author, AnonymousUser.username)
+
+    def test_tagged_idea_rss_feed_leaves_out_ideas_made_private_since(self):
+        for idea in Idea.objects.filter(id__in=[4, 5]):
+            idea.tags.add('tag_5')
+        get_tagged_idea_ids(Tag.objects.get(slug='tag_5'))
+        # bypass the signals which update the cached ids
+        Idea.objects.filter(id=5).update(visibility=False)
+        feed = feedparser.parse(self.client.get(self.get_url()).content)
+        self.assertEqual([item.title for item in feed['items']], ['Anonymous Idea: idea number 4'])
+
+    def test_tagged_idea_rss_feed_for_absent_tag(self):
+        self.assertEqual(self.client.get(self.get_url(slug='absent')).status_code, 404)
+
+
+class TestConceiverIdeaRSSFeed(TestIdeaBase):
+    def get_url(self, username=None):
+        return reverse('ideas:conceiver-rss-feed', kwargs={'username': username or self.user.username})
+
+    def setUp(self):
+        super().setUp()
+        caches['querysets'].clear()
+
+    def test_conceiver_idea_rss_feed(self):
+        """Test the 17 public ideas of the user are present"""
+        feed = feedparser.parse(self.client.get(self.get_url()).content)
+        self.assertEqual(feed['bozo'], 0)
+        self.assertEqual(len(feed['items']), 17)
+        self.assertEqual({item.author for item in feed['items']}, {self.user.get_full_name()})
+
+    def test_conceiver_idea_rss_feed_for_anonymous_ideas(self):
+        feed = feedparser.parse(self.client.get(self.get_url(AnonymousUser.username)).content)
+        self.assertEqual(len(feed['items']), 6)
+
+    def test_conceiver_idea_rss_feed_for_absent_user(self):
+        self.assertEqual(self.client.get(self.get_url('absent')).status_code, 404)
@@ -1,8 +1,6 @@
 from django.urls import path
-from django.views.decorators.http import condition
 
-from ideas import views
-from ideas.utils import latest_entry
+from ideas import feeds, views
 
 app_name = 'ideas'
 
@@ -24,9 +22,11 @@ urlpatterns = [
     path('idea/conceiver/<str:username>/',
          views.ConceiverIdeaListView.as_view(), name='conceiver-ideas'),
     path('idea/tag/<slug:slug>/', views.TaggedIdeaListView.as_view(), name='tagged'),
+    path('search/', views.SearchIdeaListView.as_view(), name='search'),
     path('subscription/', views.subscribe, name='subscription'),
-    path('latest/rss-feed/',
-         condition(last_modified_func=latest_entry)(views.LatestIdeaRSSFeed()),
-         name='rss-feed'),
+    path('latest/rss-feed/', feeds.LatestIdeaRSSFeed(), name='rss-feed'),
+    path('idea/tag/<slug:slug>/rss-feed/', feeds.TaggedIdeaRSSFeed(), name='tagged-rss-feed'),
+    path('idea/conceiver/<str:username>/rss-feed/', feeds.ConceiverIdeaRSSFeed(), name='conceiver-rss-feed'),
+    path('tags/trending/', views.trending_tags, name='trending-tags'),
     path('tags-autocomplete/', views.TagsAutoComplete.as_view(), name='tags-autocomplete'),
 ]
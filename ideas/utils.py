@@ -1,6 +1,14 @@
 """General purpose functions that provide utility throughout the application"""
-from django.apps import apps
+import hashlib
+import math
+import string
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.template.defaultfilters import slugify
+
+# lowercase only, the slugs are compared case insensitively by some collations(e.g. MySQL)
+BASE36_DIGITS = string.digits + string.ascii_lowercase
 
 
 def process_idea_form(request, form):
@@ -23,14 +31,73 @@ def process_idea_form(request, form):
     return form
 
 
-def latest_entry(request):
+def base36_encode(number):
+    """
+    Returns
+        str: the non negative number in base 36, e.g. 1295 is `zz`.
+    """
+    digits = []
+    while True:
+        number, remainder = divmod(number, len(BASE36_DIGITS))
+        digits.append(BASE36_DIGITS[remainder])
+        if not number:
+            return ''.join(reversed(digits))
+
+
+def get_idea_slug(title, idea_id, max_length):
+    """
+    Returns
+        str: the slugified title suffixed with the id of the idea in base 36, unique as the id is.
+
+    Args
+        title: str
+        idea_id: int
+        max_length: int
+            The title is trimmed so that the slug fits within it.
+    """
+    suffix = base36_encode(idea_id)
+    title = slugify(title)[:max_length - len(suffix) - 1].strip('-')
+    return f'{title}-{suffix}' if title else suffix
+
+
+def is_idea_slug(slug, idea_id):
     """
     Returns
-        date: date-time
-            The date time of the latest public idea posted.
+        bool: whether the slug is suffixed with the id of the idea(see get_idea_slug), no other idea can have it
+            as the suffix follows the last hyphen and base 36 has none.
     """
-    Idea = apps.get_model('ideas', 'Idea')
-    return Idea.objects.filter(visibility=True).latest('date_created').date_created
+    return slug.rpartition('-')[2] == base36_encode(idea_id)
+
+
+def get_hot_score(views, flag_count, date_created):
+    """
+    Returns
+        float: the rank of the idea in the hot ideas, the higher the hotter. Every tenfold of views counts as much
+            as being created `IDEA_HOT_DECAY_SECONDS` later, every flag takes away `IDEA_HOT_FLAG_PENALTY` of it.
+            The score of an idea doesn't change with time, the newer ideas outrank it instead.
+
+    Args
+        views: int
+        flag_count: int
+        date_created: datetime
+    """
+    return (
+        math.log10(1 + views)
+        - settings.IDEA_HOT_FLAG_PENALTY * flag_count
+        + date_created.timestamp() / settings.IDEA_HOT_DECAY_SECONDS
+    )
+
+
+def tags_autocomplete_etag(request):
+    """
+    Returns
+        str: the hash of the versions of the tag index and its counts and the query,
+            the response changes with any of them.
+    """
+    from ideas import tag_index
+
+    index = tag_index.get_index()
+    return hashlib.md5(f'{index.version}:{index.counts_version}?{request.GET.urlencode()}'.encode()).hexdigest()
 
 
 def get_content_type(model_obj):
@@ -0,0 +1,107 @@
+"""
+Count the views of the ideas in the memory of each process, a thread of the process writes them to
+the database once every `IDEA_VIEWS_BUFFER_SECONDS` and once more when the process exits, serving
+the pages never queries the database.
+
+The counts of a process are inserted as rows of `PendingViews`, which are only ever inserted by the processes,
+hence they never contend with each other nor with the flush. The command flush_idea_views claims the rows,
+adds them to `Idea.views` and deletes them in a single transaction. A process that is killed loses at most
+the views it counted since it last wrote them, nothing is kept in the cache which may expire or cull the counts.
+"""
+import atexit
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Sum
+
+_views = Counter()
+_writer_pid = None
+_lock = threading.Lock()
+
+
+def record_view(idea_id):
+    """Count a view of the idea, the views counted by the process are written by its writer thread"""
+    with _lock:
+        _views[idea_id] += 1
+    # a process forked from another doesn't have its threads
+    if _writer_pid != os.getpid() and settings.IDEA_VIEWS_BUFFER_SECONDS is not None:
+        start_writer()
+
+
+def start_writer():
+    """Start the thread of the process writing its views every `IDEA_VIEWS_BUFFER_SECONDS`, unless it is running"""
+    global _writer_pid
+    with _lock:
+        if _writer_pid == os.getpid():
+            return
+        _writer_pid = os.getpid()
+    threading.Thread(target=_write_periodically, name='idea-views-writer', daemon=True).start()
+
+
+def _write_periodically():
+    while True:
+        time.sleep(settings.IDEA_VIEWS_BUFFER_SECONDS)
+        # the thread keeps its own connection, which is closed once it is broken or too old
+        close_old_connections()
+        write_views()
+
+
+def write_views():
+    """
+    Insert the views counted by the process as rows of `PendingViews`, they are counted
+    again by the process when the insert fails.
+
+    Returns
+        int: the number of views written.
+    """
+    from ideas.models import PendingViews
+
+    global _views
+    with _lock:
+        views, _views = _views, Counter()
+    if not views:
+        return 0
+
+    try:
+        with transaction.atomic():
+            PendingViews.objects.bulk_create([
+                PendingViews(idea_id=idea_id, views=count) for idea_id, count in views.items()
+            ])
+    except DatabaseError:
+        with _lock:
+            _views.update(views)
+        return 0
+    return sum(views.values())
+
+
+# write the views counted since the last write as the process exits, the processes forked from it inherit the hook
+atexit.register(write_views)
+
+
+def flush_views():
+    """
+    Add the views written by the processes to `Idea.views`.
+
+    The rows are claimed, added and deleted in a single transaction, a flush that dies adds none of them.
+    A concurrent flush waits for the rows claimed by another, or skips them once they are deleted,
+    and the rows inserted meanwhile are left for the next flush.
+
+    Returns
+        tuple: (number of ideas updated, number of views added)
+    """
+    from ideas.models import Idea, PendingViews
+
+    claim = uuid.uuid4().hex
+    with transaction.atomic():
+        if not PendingViews.objects.filter(claim=None).update(claim=claim):
+            return 0, 0
+        claimed = PendingViews.objects.filter(claim=claim)
+        counts = Counter(dict(claimed.values('idea_id').annotate(total=Sum('views')).values_list('idea_id', 'total')))
+        updated = Idea.objects.add_views(counts)
+        claimed.delete()
+    return updated, sum(counts.values())
@@ -3,28 +3,36 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import AnonymousUser, User
 from django.contrib.messages.views import SuccessMessageMixin
-from django.contrib.syndication.views import Feed
+from django.core.cache import caches
 from django.core.exceptions import PermissionDenied
+from django.db.models import prefetch_related_objects
 from django.http import Http404
 from django.http.response import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
 from meta.views import Meta
 from taggit.models import Tag
 
+from ideas import tag_index, view_counts
 from ideas.forms import AnonymousIdeaCreateForm, NonAnonymousIdeaCreateForm
-from ideas.models import Idea
-from ideas.utils import process_idea_form
+from ideas.models import Idea, TagStats, get_tagged_idea_ids
+from ideas.utils import process_idea_form, tags_autocomplete_etag
 from subscribers.models import Subscriber
 from utils import validators
+from utils.conditional import ConditionalListMixin
+from utils.pagination import KeysetPaginationMixin
 
 global paginate_by
 paginate_by = 15
 
+TRENDING_TAGS_LIMIT = 50
+TRENDING_TAGS_CACHE_TIMEOUT = 60 * 5
+
 global meta_home
 meta_home = Meta(title='IdeaFare | Let us make the world a better place!',
                  description='Read, share and discuss about the ideas that you think can change the world.',
@@ -37,7 +45,8 @@ meta_home = Meta(title='IdeaFare | Let us make the world a better place!',
 @require_http_methods(['POST'])
 def subscribe(request):
     """
-    adds emails to the model Subscribers after verifying legit emails only on POST requests.
+    adds emails to the model Subscribers after verifying the syntax of emails only on POST requests.
+    Their domains are verified later by the command verify_subscribers.
     Returns Jsonresponse with properties response and status.
     """
     data = {'msg': '', 'email': '', 'status': -1}
@@ -61,6 +70,31 @@ def subscribe(request):
     return HttpResponseBadRequest(_('Bad Request!'))
 
 
+@require_http_methods(['GET'])
+def trending_tags(request):
+    """
+    Returns Jsonresponse with the tags used by most of the ideas created within the period
+    (day, week or all, defaults to day) with their counts, at most `limit` of them.
+    """
+    period = request.GET.get('period', 'day')
+    if period not in TagStats.objects.PERIOD_FIELDS:
+        return HttpResponseBadRequest(_('Bad Request! period must be one of day, week or all'))
+    try:
+        limit = min(int(request.GET.get('limit', TRENDING_TAGS_LIMIT)), TRENDING_TAGS_LIMIT)
+    except ValueError:
+        return HttpResponseBadRequest(_('Bad Request! limit must be a number'))
+
+    def get_tags():
+        field = TagStats.objects.PERIOD_FIELDS[period]
+        return [
+            {'name': stats.tag.name, 'slug': stats.tag.slug, 'count': getattr(stats, field)}
+            for stats in TagStats.objects.trending(period, limit=TRENDING_TAGS_LIMIT)
+        ]
+
+    tags = caches['querysets'].get_or_set(f'trending_tags:{period}', get_tags, timeout=TRENDING_TAGS_CACHE_TIMEOUT)
+    return JsonResponse({'period': period, 'tags': tags[:max(limit, 0)]})
+
+
 @require_http_methods(['GET'])
 def about(request):
     """Returns information about the concept of IdeaFare"""
@@ -95,16 +129,41 @@ def privacy_policy(request):
 
 
 @method_decorator(require_http_methods(['GET']), name='dispatch')
-class Home(ListView):
-    """Returns the latest ideas created with visibility public"""
+class Home(ConditionalListMixin, KeysetPaginationMixin, ListView):
+    """
+    Returns the ideas created with visibility public, the latest first or the hot ones first
+    with `?sort=hot`(see Idea.hot_score). Both orders are served by an index.
+    """
     template_name = 'ideas/home.html'
     context_object_name = 'ideas'
-    queryset = Idea.public_objects.all()
+    queryset = Idea.public_objects.for_listing()
     paginate_by = paginate_by
+    orderings = {
+        'latest': ('-date_created', '-id'),
+        'hot': ('-hot_score', '-id'),
+    }
+
+    def get_sort(self):
+        sort = self.request.GET.get('sort')
+        return sort if sort in self.orderings else 'latest'
+
+    @property
+    def keyset_ordering(self):
+        return self.orderings[self.get_sort()]
+
+    def get_listing_keys(self):
+        return ['ideas']
+
+    def get_queryset(self):
+        return super().get_queryset().order_by(*self.keyset_ordering)
 
     def get_context_data(self, **kwargs):
         context = super(Home, self).get_context_data(**kwargs)
         context['meta'] = meta_home
+        context['sort'] = self.get_sort()
+        context['sorts'] = list(self.orderings)
+        if context['sort'] != 'latest':
+            context['page_query'] = urlencode({'sort': context['sort']}) + '&'
         return context
 
 
@@ -128,12 +187,27 @@ class NonAnonymousIdeaCreateView(LoginRequiredMixin, AnonymousIdeaCreateView):
     form_class = NonAnonymousIdeaCreateForm
 
 
+class IdeaObjectMixin:
+    """
+    Fetch the idea, along with its conceiver, only once per request. The permission checks
+    and the handlers of the views call `get_object` again and are given the same idea.
+    """
+    queryset = Idea.objects.select_related('user')
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_idea'):
+            self._idea = super().get_object()
+        return self._idea
+
+
 @method_decorator(require_http_methods(['GET']), name='dispatch')
-class IdeaDetailView(UserPassesTestMixin, DetailView):
+class IdeaDetailView(IdeaObjectMixin, UserPassesTestMixin, DetailView):
     """Returns detail view for an idea if it is public or is owned by the logged in user"""
     template_name = 'ideas/idea_details.html'
     context_object_name = 'idea'
-    queryset = Idea.objects.all()
+    queryset = Idea.objects.select_related('user').prefetch_related('tags')
 
     def test_func(self):
         """Allow only conceiver to view their idea if it's private"""
@@ -141,12 +215,29 @@ class IdeaDetailView(UserPassesTestMixin, DetailView):
         if not idea.visibility:
             if self.request.user == idea.conceiver:
                 return True
-            return PermissionDenied(_('You are not authorised to view this idea.'))
+            raise PermissionDenied(_('You are not authorised to view this idea.'))
         return True
 
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.get_object()
+        except Http404:
+            # the links to the ideas given a random slug before it was derived from their ids
+            slug = Idea.objects.filter(legacy_slug=kwargs.get('slug')).values_list('slug', flat=True).first()
+            if slug is None:
+                raise
+            return redirect('ideas:idea-details', slug=slug, permanent=True)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # counted by the process, added to the idea by the command flush_idea_views
+        view_counts.record_view(self.object.pk)
+        return response
+
 
 @method_decorator(require_http_methods(['GET', 'POST', 'PUT']), name='dispatch')
-class IdeaUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class IdeaUpdateView(LoginRequiredMixin, IdeaObjectMixin, UserPassesTestMixin, UpdateView):
     """Allows only conceivers to update their idea"""
     model = Idea
     form_class = NonAnonymousIdeaCreateForm
@@ -177,7 +268,7 @@ class IdeaUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
 
 @method_decorator(require_http_methods(['GET', 'POST', 'DELETE']), name='dispatch')
-class IdeaDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, DeleteView):
+class IdeaDeleteView(LoginRequiredMixin, IdeaObjectMixin, UserPassesTestMixin, SuccessMessageMixin, DeleteView):
     """Allow only conceivers to delete their idea and give a successfull message upon completion"""
     model = Idea
     context_object_name = 'idea'
@@ -200,41 +291,51 @@ class IdeaDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixi
 
 
 @method_decorator(require_http_methods(['GET']), name='dispatch')
-class ConceiverIdeaListView(ListView):
+class ConceiverIdeaListView(ConditionalListMixin, KeysetPaginationMixin, ListView):
     """
     Returns the list of all idea by a conceiver(user)
     All anonymous users are considered the same.
     """
     model = Idea
     template_name = 'ideas/conceiver_ideas.html'
-    queryset = Idea.objects.all()
+    queryset = Idea.objects.for_listing()
     context_object_name = 'ideas'
     paginate_by = paginate_by
 
+    def get_conceiver(self):
+        """Returns the conceiver, fetched only once, None for anonymous ideas"""
+        if not hasattr(self, 'conceiver'):
+            username = self.kwargs.get('username', None)
+            if username is not None and username == 'anonymous':
+                self.conceiver = None
+            else:
+                self.conceiver = get_object_or_404(User, username=username.lower())
+        return self.conceiver
+
+    def get_listing_keys(self):
+        conceiver = self.get_conceiver()
+        return [f'ideas:conceiver:{conceiver.id if conceiver else "anonymous"}']
+
     def get_queryset(self):
-        username = self.kwargs.get('username', None)
+        user = self.get_conceiver()
         # Return anonymous posts
-        if username is not None and username == 'anonymous':
+        if user is None:
             return self.queryset.filter(user=None)
 
-        user = get_object_or_404(User, username=username.lower())
-
         if self.request.user == user:  # For logged in users return all of their ideas
             return self.queryset.filter(user=user)
 
         # Show only public ideas
-        return Idea.public_objects.filter(user=user)
+        return Idea.public_objects.for_listing().filter(user=user)
 
     def get_context_data(self, **kwargs):
         context = super(ConceiverIdeaListView, self).get_context_data(**kwargs)
-        username = self.kwargs.get('username', None)
+        user = self.get_conceiver()
 
         # Return anonymous posts
-        if username is not None and username == 'anonymous':
-            user = AnonymousUser
-            name = user
+        if user is None:
+            name = AnonymousUser
         else:
-            user = get_object_or_404(User, username=username.lower())
             name = user.get_full_name()
 
         context['meta'] = Meta(title=f'{name} | Idea',
@@ -245,23 +346,38 @@ class ConceiverIdeaListView(ListView):
 
 
 @method_decorator(require_http_methods(['GET']), name='dispatch')
-class TaggedIdeaListView(ListView):
+class TaggedIdeaListView(ConditionalListMixin, ListView):
+    """Returns the public ideas with a tag, paginated over the cached list of their ids"""
     template_name = 'ideas/idea_tagged.html'
     context_object_name = 'ideas'
+    paginate_by = paginate_by
 
-    def get_queryset(self):
-        idea_list = Idea.objects.all().filter(
-            tags__slug=self.kwargs.get('slug').lower())
-        if idea_list:
-            return idea_list
-        raise Http404('Tag not present')
+    def get_tag(self):
+        """Returns the tag, fetched only once"""
+        if not hasattr(self, 'tag'):
+            self.tag = get_object_or_404(Tag, slug=self.kwargs.get('slug').lower())
+        return self.tag
 
-    paginate_by = paginate_by
+    def get_listing_keys(self):
+        return [f'ideas:tag:{self.get_tag().id}']
+
+    def get_queryset(self):
+        idea_ids = get_tagged_idea_ids(self.get_tag())
+        if not idea_ids:
+            raise Http404('Tag not present')
+        return idea_ids
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, idea_ids, is_paginated = super().paginate_queryset(queryset, page_size)
+        # only the ideas of the page are loaded, those made private or hidden since are left out
+        ideas = Idea.public_objects.get_by_ids(idea_ids)
+        page.object_list = [ideas[idea_id] for idea_id in idea_ids if idea_id in ideas]
+        prefetch_related_objects(page.object_list, 'tags')
+        return paginator, page, page.object_list, is_paginated
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        slug = self.kwargs.get('slug').lower()
-        tag = get_object_or_404(Tag, slug=slug).name
+        tag = self.tag.name
         context['meta'] = Meta(title='About | IdeaFare',
                                description=f'Ideas with the tag {tag}',
                                keywords=meta_home.keywords + [tag])
@@ -270,39 +386,45 @@ class TaggedIdeaListView(ListView):
 
 
 @method_decorator(require_http_methods(['GET']), name='dispatch')
-class TagsAutoComplete(autocomplete.Select2QuerySetView):
-    """Used for autocompletion of tags"""
-    def get_queryset(self):
-
-        qs = Tag.objects.all()
-
-        if self.q:
-            qs = qs.filter(name__icontains=self.q)
-        return qs.order_by('name')
-
-
-class LatestIdeaRSSFeed(Feed):
-    """"Publish the RSS feed for latest public ideas"""
-    title = _('Latest ideas from IdeaFare')
-    link = ''
-    description = meta_home.description
-
-    # def feed_extra_kwargs(self, obj):
-    #     return {}
+class SearchIdeaListView(ListView):
+    """
+    Returns the public ideas matching the query in the title, the concept or the tags, the best match first.
 
-    def items(self, top_n=5):
-        return Idea.public_objects.all()[:top_n]
+    Every match is ranked, which takes about 1ms per 1000 matching ideas with FTS5: on 1M ideas the queries
+    matching up to 50k of them answer within 50ms, while a word or a short prefix found in most ideas
+    takes up to a second.
+    """
+    template_name = 'ideas/search.html'
+    context_object_name = 'ideas'
+    paginate_by = paginate_by
 
-    def item_title(self, item):
-        return item.title
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return []
+        # the conceivers are joined to the matches
+        return Idea.public_objects.select_related('user').search(self.query)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, ideas, is_paginated = super().paginate_queryset(queryset, page_size)
+        # only the ideas of the page are shown, load their tags in a batch
+        prefetch_related_objects(ideas, 'tags')
+        return paginator, page, ideas, is_paginated
 
-    def item_author_name(self, item):
-        if item.user is None:
-            return AnonymousUser()
-        return item.conceiver.get_full_name()
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['meta'] = Meta(title=f'{self.query} | Search | IdeaFare' if self.query else 'Search | IdeaFare',
+                               description='Search the ideas on IdeaFare',
+                               keywords=meta_home.keywords + ['search'])
+        context['query'] = self.query
+        # keep the query in the links to the other pages
+        context['page_query'] = urlencode({'q': self.query}) + '&'
+        return context
 
-    def item_description(self, item):
-        return item.concept
 
-    def item_link(self, item):
-        return item.get_absolute_url()
+@method_decorator(require_http_methods(['GET']), name='dispatch')
+@method_decorator(condition(etag_func=tags_autocomplete_etag), name='dispatch')
+class TagsAutoComplete(autocomplete.Select2QuerySetView):
+    """Used for autocompletion of tags, the most used tags containing the query are looked up in memory"""
+    def get_queryset(self):
+        return tag_index.get_index().search(self.q, limit=self.paginate_by)
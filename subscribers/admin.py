@@ -6,7 +6,9 @@ from .models import Subscriber
 
 
 class SubscriberAdmin(admin.ModelAdmin):
-    list_display = ('email', 'date')
+    list_display = ('email', 'date', 'state', 'date_verified')
+    list_filter = ('state',)
+    search_fields = ('email',)
 
 
 admin.site.register(Subscriber, SubscriberAdmin)
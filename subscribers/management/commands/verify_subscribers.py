@@ -0,0 +1,71 @@
+"""Verify the emails of the pending subscribers in the background, the table of subscribers being the queue"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from subscribers.models import Subscriber
+from utils import validators
+
+
+class Command(BaseCommand):
+    help = (
+        'Verify the emails of the pending subscribers by looking up the MX records of their domains, '
+        'marking them as verified or invalid. Runs until interrupted unless --once is passed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Verify the pending subscribers once and exit')
+        parser.add_argument('--batch-size', type=int, default=100, help='Number of subscribers verified at a time')
+        parser.add_argument('--interval', type=float, default=30, help='Seconds to sleep between two runs')
+
+    def verify(self, batch_size):
+        """
+        Verify all the pending subscribers once, the domains are looked up once per run
+        and their results are shared with the other workers through the cache.
+        Subscribers whose domains can't be resolved for now remain pending for the next run.
+
+        Returns
+            tuple: number of (verified, invalid) subscribers.
+        """
+        domains = {}
+        total_verified = total_invalid = 0
+        last_id = 0
+        while True:
+            subscribers = list(
+                Subscriber.objects.filter(state=Subscriber.State.PENDING, id__gt=last_id)
+                .order_by('id').only('id', 'email')[:batch_size]
+            )
+            if not subscribers:
+                break
+            last_id = subscribers[-1].id
+
+            verified, invalid = [], []
+            for subscriber in subscribers:
+                domain = subscriber.domain
+                if domain not in domains:
+                    domains[domain] = validators.has_mx_records(domain)
+                if domains[domain]:
+                    verified.append(subscriber.id)
+                elif domains[domain] is False:
+                    invalid.append(subscriber.id)
+
+            # another worker may have verified them in the meantime
+            pending = Subscriber.objects.filter(state=Subscriber.State.PENDING)
+            now = timezone.now()
+            total_verified += pending.filter(id__in=verified).update(state=Subscriber.State.VERIFIED, date_verified=now)
+            total_invalid += pending.filter(id__in=invalid).update(state=Subscriber.State.INVALID, date_verified=now)
+        return total_verified, total_invalid
+
+    def handle(self, *args, **options):
+        while True:
+            verified, invalid = self.verify(options['batch_size'])
+            if verified or invalid or options['verbosity'] > 1:
+                self.stdout.write(f'Verified {verified} and invalidated {invalid} subscribers')
+            if options['verbosity'] > 1:
+                self.stdout.write('MX cache: {hits} hits, {misses} misses, {hit_rate:.1%} hit rate'.format(
+                    **validators.get_mx_cache_stats()
+                ))
+            if options['once']:
+                break
+            time.sleep(options['interval'])
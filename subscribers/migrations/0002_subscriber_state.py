@@ -0,0 +1,32 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+PENDING, VERIFIED = 1, 2
+
+
+def mark_existing_verified(apps, schema_editor):
+    """The existing subscribers were verified with MX checks when they subscribed"""
+    Subscriber = apps.get_model('subscribers', 'Subscriber')
+    Subscriber.objects.filter(state=PENDING).update(state=VERIFIED, date_verified=models.F('date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscribers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriber',
+            name='date_verified',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='subscriber',
+            name='state',
+            field=models.SmallIntegerField(choices=[(1, 'Pending verification'), (2, 'Verified'), (3, 'Invalid')], db_index=True, default=1),
+        ),
+        migrations.RunPython(mark_existing_verified, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,22 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 
 class Subscriber(models.Model):
+    class State(models.IntegerChoices):
+        PENDING = 1, _('Pending verification')
+        VERIFIED = 2, _('Verified')
+        INVALID = 3, _('Invalid')
+
     email = models.EmailField(unique=True, max_length=254, editable=False)
     date = models.DateTimeField(auto_now_add=True)
+    # emails are verified in the background by the command verify_subscribers
+    state = models.SmallIntegerField(choices=State.choices, default=State.PENDING, db_index=True)
+    date_verified = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f'email: {self.email}, date: {self.date.strftime("%m/%d/%Y, %H:%M:%S")}'
+
+    @property
+    def domain(self):
+        return self.email.rsplit('@', 1)[-1].lower()
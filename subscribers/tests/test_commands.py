@@ -0,0 +1,36 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from subscribers.models import Subscriber
+from tests.base import TestBase
+
+
+class TestVerifySubscribers(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.domains = {'gmail.com': True, 'bogus.test': False, 'timeout.test': None}
+        for domain in cls.domains:
+            for number in range(2):
+                Subscriber.objects.create(email=f'user{number}@{domain}')
+
+    @patch('utils.validators.has_mx_records')
+    def test_verify_subscribers(self, mocked_attr):
+        mocked_attr.side_effect = self.domains.get
+        out = StringIO()
+        call_command('verify_subscribers', '--once', '--batch-size', '1', stdout=out)
+
+        self.assertEqual('Verified 2 and invalidated 2 subscribers' in out.getvalue(), True)
+        # every domain is looked up once
+        self.assertEqual(mocked_attr.call_count, 3)
+        for domain, state in [
+            ('gmail.com', Subscriber.State.VERIFIED),
+            ('bogus.test', Subscriber.State.INVALID),
+            ('timeout.test', Subscriber.State.PENDING),
+        ]:
+            subscribers = Subscriber.objects.filter(email__endswith=domain)
+            self.assertEqual(set(subscribers.values_list('state', flat=True)), {state})
+            dates_verified = subscribers.values_list('date_verified', flat=True)
+            self.assertEqual(all(dates_verified), state != Subscriber.State.PENDING)
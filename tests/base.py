@@ -1,16 +1,20 @@
 import os
 import random
 import sys
+from contextlib import contextmanager
 from string import ascii_lowercase
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
 
 from ideas.models import Idea
 
 User = get_user_model()
 
 
+# the views are written by the tests rather than by a thread of their own(see ideas.view_counts)
+@override_settings(IDEA_VIEWS_BUFFER_SECONDS=None)
 class TestBase(TestCase):
 
     def get_unique_email(self) -> str:
@@ -30,6 +34,30 @@ class TestBase(TestCase):
         random_string = ''.join(random.choice(letters) for i in range(5))
         return f'{email_username}+{random_string}@{domain}'
 
+    @staticmethod
+    @contextmanager
+    def capture_on_commit_callbacks(using=DEFAULT_DB_ALIAS, execute=False):
+        """
+        Collect the callbacks passed to `transaction.on_commit` in the block, the transaction of
+        a test is never committed hence they are not run otherwise.
+
+        Args:
+            using (str, optional): The alias of the database. Defaults to DEFAULT_DB_ALIAS.
+            execute (bool, optional): If the callbacks are run at the end of the block. Defaults to False.
+
+        Yields:
+            list: the callbacks, filled at the end of the block
+        """
+        callbacks = []
+        start = len(connections[using].run_on_commit)
+        try:
+            yield callbacks
+        finally:
+            callbacks.extend(func for savepoint_ids, func in connections[using].run_on_commit[start:])
+            if execute:
+                for callback in callbacks:
+                    callback()
+
     def setUp(self) -> None:
         """Set the environment variable to disable RECAPTCHA"""
         super().setUp()
@@ -0,0 +1,48 @@
+import tempfile
+
+from django.test import SimpleTestCase
+
+from utils.cache import FileBasedCache
+
+
+class TestFileBasedCache(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def get_cache(self, cull_interval=0):
+        return FileBasedCache(self.dir.name, {
+            'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 2, 'CULL_INTERVAL': cull_interval}
+        })
+
+    def test_expired_entries_are_culled_first(self):
+        cache = self.get_cache()
+        cache.set('version', 1, timeout=None)
+        cache.set('expired', 1, timeout=0)
+        cache.set('stamp', 1)
+        cache.set('ids', 1)
+        # full, half of the entries are removed before the next one is set, the expired one among them
+        cache.set('page', 1)
+        self.assertEqual(len(cache._list_cache_files()), 3)
+        self.assertTrue(cache.has_key('version'))
+        self.assertTrue(cache.has_key('page'))
+        self.assertEqual(sum(cache.has_key(key) for key in ['stamp', 'ids']), 1)
+
+    def test_entries_without_timeout_are_never_culled(self):
+        cache = self.get_cache()
+        for key in ['version', 'counts_version', 'hits']:
+            cache.set(key, 1, timeout=None)
+        for key in ['stamp', 'ids', 'page']:
+            cache.set(key, 1)
+        self.assertEqual(cache.get_many(['version', 'counts_version', 'hits']), {
+            'version': 1, 'counts_version': 1, 'hits': 1
+        })
+        self.assertLessEqual(len(cache._list_cache_files()), 5)
+
+    def test_directory_is_listed_once_every_interval(self):
+        cache = self.get_cache(cull_interval=60)
+        for index in range(6):
+            cache.set(f'key_{index}', 1)
+        # only the first set checked whether the cache is full
+        self.assertEqual(len(cache._list_cache_files()), 6)
@@ -0,0 +1,26 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from utils.conditional import get_listing_stamp, touch_listings
+
+
+class TestListingStamp(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        caches['querysets'].clear()
+
+    def test_get_listing_stamp(self):
+        with patch('utils.conditional.time') as time:
+            time.time.return_value = 100.0
+            # listings without a stamp are taken to be modified now
+            self.assertEqual(get_listing_stamp(['ideas', 'ideas:tag:1']), 100.0)
+
+        with patch('utils.conditional.time') as time:
+            time.time.return_value = 200.0
+            self.assertEqual(get_listing_stamp(['ideas']), 100.0)
+            touch_listings(['ideas:tag:1'])
+
+        self.assertEqual(get_listing_stamp(['ideas']), 100.0)
+        self.assertEqual(get_listing_stamp(['ideas', 'ideas:tag:1']), 200.0)
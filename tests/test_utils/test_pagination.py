@@ -0,0 +1,54 @@
+from ideas.models import Idea
+from tests.base import TestBase
+from utils.pagination import InvalidCursor, KeysetPaginator
+
+
+class TestKeysetPaginator(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for idea_id in range(1, 8):
+            cls.create_idea(title=f'idea {idea_id}', concept=f'concept {idea_id}', user=cls.user)
+
+    def get_paginator(self, per_page=3):
+        return KeysetPaginator(Idea.objects.all(), per_page)
+
+    def test_first_page(self):
+        paginator = self.get_paginator()
+        page = paginator.page()
+
+        self.assertEqual(list(page), list(Idea.objects.order_by('-date_created', '-id')[:3]))
+        self.assertEqual(page.has_previous(), False)
+        self.assertEqual(page.has_next(), True)
+
+    def test_walk_forward_and_backward(self):
+        paginator = self.get_paginator()
+        expected = list(Idea.objects.order_by('-date_created', '-id'))
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        last = paginator.page(second.next_cursor)
+
+        self.assertEqual(list(second), expected[3:6])
+        self.assertEqual(list(last), expected[6:])
+        self.assertEqual(last.has_next(), False)
+        self.assertEqual(last.has_previous(), True)
+
+        self.assertEqual(list(paginator.page(last.previous_cursor)), expected[3:6])
+        back_to_first = paginator.page(second.previous_cursor)
+        self.assertEqual(list(back_to_first), expected[:3])
+        self.assertEqual(back_to_first.has_previous(), False)
+        self.assertEqual(back_to_first.has_next(), True)
+
+    def test_no_count_query(self):
+        paginator = self.get_paginator()
+        cursor = paginator.page().next_cursor
+
+        with self.assertNumQueries(1):
+            paginator.page(cursor)
+
+    def test_invalid_cursor(self):
+        paginator = self.get_paginator()
+        for cursor in ['abcd', 'not base64!', paginator.encode_cursor(Idea.objects.first())[:-4]]:
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
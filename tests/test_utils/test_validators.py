@@ -1,5 +1,9 @@
 from unittest.mock import patch
 
+from django.core.cache import cache
+from dns.exception import Timeout
+from dns.resolver import NXDOMAIN, NoAnswer
+
 from tests.base import TestBase
 from utils import validators
 
@@ -20,3 +24,55 @@ class TestValidators(TestBase):
         test_data = [self.get_email() for i in range(3)]
         for data in test_data:
             self.assertEqual(True, validators.is_email_valid(data))
+
+    @patch('utils.validators.query')
+    def test_lookup_mx_records(self, mocked_attr):
+        """Test MX records are looked up and that unresolved domains are undetermined"""
+        mocked_attr.return_value = ['mx.example.com']
+        self.assertEqual(validators.lookup_mx_records('example.com'), True)
+
+        for exception, result in [(NXDOMAIN, False), (NoAnswer, False), (Timeout, None)]:
+            mocked_attr.side_effect = exception
+            self.assertEqual(validators.lookup_mx_records('example.com'), result)
+
+    @patch('utils.validators.lookup_mx_records')
+    def test_has_mx_records_is_cached(self, mocked_attr):
+        """Test results are cached per domain, with undetermined results not cached at all"""
+        domains = {'valid.test': True, 'invalid.test': False, 'timeout.test': None}
+        cache.delete_many([validators.MX_CACHE_KEY.format(domain) for domain in domains])
+        validators.reset_mx_cache_stats()
+        mocked_attr.side_effect = lambda domain, timeout: domains[domain]
+
+        for __ in range(2):
+            for domain, result in domains.items():
+                self.assertEqual(validators.has_mx_records(domain.upper()), result)
+        self.assertEqual(mocked_attr.call_count, 4)
+        self.assertEqual(validators.get_mx_cache_stats(), {'hits': 2, 'misses': 4, 'hit_rate': 2 / 6})
+
+        with self.settings(EMAIL_DOMAIN_NEGATIVE_CACHE_TIMEOUT=0):
+            cache.delete(validators.MX_CACHE_KEY.format('invalid.test'))
+            validators.has_mx_records('invalid.test')
+            validators.has_mx_records('invalid.test')
+        self.assertEqual(mocked_attr.call_count, 6)
+
+    @patch('utils.validators.lookup_mx_records', return_value=True)
+    def test_mx_cache_stats_are_counted_by_the_process(self, mocked_attr):
+        """Test hits and misses cost no writes to the cache until they are added to it, without an expiry"""
+        cache.delete(validators.MX_CACHE_KEY.format('valid.test'))
+        validators.reset_mx_cache_stats()
+        validators.has_mx_records('valid.test')
+        with patch.object(validators.cache, 'incr') as incr:
+            validators.has_mx_records('valid.test')
+        incr.assert_not_called()
+
+        with patch.object(validators.cache, 'touch', wraps=validators.cache.touch) as touch:
+            self.assertEqual(validators.get_mx_cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        touch.assert_any_call(validators.MX_CACHE_HITS_KEY, None)
+
+    @patch('utils.validators.has_mx_records')
+    def test_email_verification_with_mx(self, mocked_attr):
+        """Test emails are invalid only when their domains surely don't have MX records"""
+        for result, valid in [(True, True), (None, True), (False, False)]:
+            mocked_attr.return_value = result
+            self.assertEqual(validators.is_email_valid('user@example.com', check_mx=True), valid)
+        mocked_attr.assert_called_with('example.com')
@@ -0,0 +1,57 @@
+"""Cache backends tuned for the state kept in the caches by the apps"""
+import pickle
+import random
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache as BaseFileBasedCache
+
+
+class FileBasedCache(BaseFileBasedCache):
+    """
+    File based cache which lists its directory to cull it at most once every `CULL_INTERVAL` seconds
+    per process instead of on every set, hence it may hold a few more than `MAX_ENTRIES` in between.
+
+    Once full, the expired entries are removed first and only then random ones, those set without
+    a timeout(e.g. the version of the tag index) are never culled and must remain few.
+    """
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_interval = int(params.get('OPTIONS', {}).get('CULL_INTERVAL', 30))
+        self._culled_at = None
+
+    def _cull(self):
+        now = time.monotonic()
+        if self._culled_at is not None and now - self._culled_at < self._cull_interval:
+            return
+        self._culled_at = now
+
+        filelist = self._list_cache_files()
+        num_entries = len(filelist)
+        if num_entries < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        expiring = []
+        removed = 0
+        for fname in filelist:
+            try:
+                with open(fname, 'rb') as f:
+                    expiry = pickle.load(f)
+            except FileNotFoundError:
+                continue
+            except (EOFError, pickle.UnpicklingError):
+                # an empty file is considered expired
+                expiry = 0
+            if expiry is None:
+                continue
+            if expiry < time.time():
+                self._delete(fname)
+                removed += 1
+            else:
+                expiring.append(fname)
+
+        # as many entries are removed as by FileBasedCache, the expired ones included
+        num_culled = min(max(int(num_entries / self._cull_frequency) - removed, 0), len(expiring))
+        for fname in random.sample(expiring, num_culled):
+            self._delete(fname)
@@ -0,0 +1,80 @@
+"""Conditional responses(ETag and Last-Modified) for listings, answered before the objects are listed"""
+import hashlib
+import time
+
+from django.contrib import messages
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+LISTING_STAMP_KEY = 'listing_stamp:{key}'
+# the stamps expire after an hour, which also bounds how long a relative time(e.g. 5 minutes ago)
+# or a change made without sending signals(e.g. `update()`) can remain unnoticed.
+LISTING_STAMP_TIMEOUT = 60 * 60
+
+
+def get_cache():
+    return caches['querysets']
+
+
+def touch_listings(keys):
+    """Mark the listings identified by the keys as modified now"""
+    now = time.time()
+    get_cache().set_many({LISTING_STAMP_KEY.format(key=key): now for key in keys}, LISTING_STAMP_TIMEOUT)
+
+
+def get_listing_stamp(keys):
+    """
+    Returns
+        float: the time since epoch when the latest of the listings was modified,
+            the listings without a stamp are taken to be modified now.
+
+    Args
+        keys: list
+            The keys identifying the listings shown on a page, e.g. `ideas:tag:1`.
+    """
+    cache = get_cache()
+    cache_keys = [LISTING_STAMP_KEY.format(key=key) for key in keys]
+    stamps = cache.get_many(cache_keys)
+    now = time.time()
+    for cache_key in cache_keys:
+        if cache_key not in stamps:
+            cache.add(cache_key, now, LISTING_STAMP_TIMEOUT)
+            stamps[cache_key] = now
+    return max(stamps.values())
+
+
+class ConditionalListMixin:
+    """
+    Answer `304 Not Modified` when none of the listings shown by the view has been modified since the
+    client fetched it, without listing the objects or rendering the templates.
+
+    The views return the keys of their listings from `get_listing_keys` and the models mark them as
+    modified with `touch_listings` as they change. The ETag depends on the user as the pages show
+    their details, the Last-Modified date is sent only to anonymous users for the same reason.
+    """
+    def get_listing_keys(self):
+        """Returns list of the keys of the listings shown by the view"""
+        raise NotImplementedError
+
+    def get_etag(self, stamp):
+        user_id = self.request.user.pk if self.request.user.is_authenticated else ''
+        return hashlib.md5(f'{stamp}:{user_id}:{self.request.get_full_path()}'.encode()).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+        # pending messages are shown on the page, hence it is rendered again
+        if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+            return super().dispatch(request, *args, **kwargs)
+
+        stamp = get_listing_stamp(self.get_listing_keys())
+        etag = quote_etag(self.get_etag(stamp))
+        last_modified = None if request.user.is_authenticated else int(stamp)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.setdefault('Last-Modified', http_date(last_modified))
+        return response
@@ -0,0 +1,178 @@
+"""Keyset(cursor) based pagination for querysets with a stable ordering"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """A page of results returned by the `KeysetPaginator`"""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the last row seen instead of using `OFFSET`.
+
+    Every page costs a single indexed query of `per_page + 1` rows, no matter how deep
+    it is, and no `COUNT(*)` is issued. The fields in `ordering` must be non-nullable and
+    together identify a row uniquely, e.g. `('-date_created', '-id')`.
+    """
+    keyset = True
+
+    def __init__(self, queryset, per_page, ordering=('-date_created', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [
+            (field[1:], True) if field.startswith('-') else (field, False)
+            for field in ordering
+        ]
+        self.fields = [queryset.model._meta.get_field(name) for name, __ in self.ordering]
+
+    def encode_cursor(self, obj, previous=False):
+        """
+        Returns
+            str: an opaque url safe token pointing to the position of `obj`.
+
+        Args
+            obj: the boundary object of a page.
+            previous: bool
+                Whether the token fetches the rows before `obj` instead of after it.
+        """
+        values = [field.value_to_string(obj) for field in self.fields]
+        data = json.dumps([int(previous), values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Returns
+            tuple: (previous, values) decoded from the token.
+
+        Raises
+            InvalidCursor: when the token has been tampered with.
+        """
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            previous, values = json.loads(base64.urlsafe_b64decode(cursor + padding).decode('utf-8'))
+            if len(values) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError, ValidationError):
+            raise InvalidCursor(_('That cursor is not valid'))
+        return bool(previous), values
+
+    def _seek(self, values, previous):
+        """Returns the filter that selects rows past the boundary `values` in the page direction"""
+        condition = Q()
+        for index, ((name, descending), value) in enumerate(zip(self.ordering, values)):
+            lookup = 'lt' if descending != previous else 'gt'
+            equal = {field_name: val for (field_name, __), val in zip(self.ordering[:index], values)}
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        return condition
+
+    def _order_by(self, previous):
+        return [
+            f'-{name}' if descending != previous else name
+            for name, descending in self.ordering
+        ]
+
+    def get_queryset(self, cursor=None):
+        """
+        Returns
+            QuerySet: the rows of the page that the `cursor` points to, with one extra row
+                to know whether there are more pages. Rows before the cursor are in reverse order.
+        """
+        previous = False
+        queryset = self.queryset
+        if cursor:
+            previous, values = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(values, previous))
+        return queryset.order_by(*self._order_by(previous))[:self.per_page + 1]
+
+    def page(self, cursor=None):
+        """
+        Returns
+            KeysetPage: the page that the `cursor` points to, the first page if it is empty.
+        """
+        previous = self.decode_cursor(cursor)[0] if cursor else False
+        rows = list(self.get_queryset(cursor))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if previous:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or previous:
+                next_cursor = self.encode_cursor(rows[-1])
+            if (has_more and previous) or (cursor and not previous):
+                previous_cursor = self.encode_cursor(rows[0], previous=True)
+
+        return KeysetPage(rows, self, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination for `ListView`.
+
+    Enabled when `keyset_pagination` is True, or when it is None and the setting
+    `KEYSET_PAGINATION` is True. Otherwise the default offset pagination is used.
+    """
+    keyset_pagination = None
+    keyset_ordering = ('-date_created', '-id')
+    cursor_kwarg = 'cursor'
+
+    def use_keyset_pagination(self):
+        if self.keyset_pagination is None:
+            return getattr(settings, 'KEYSET_PAGINATION', False)
+        return self.keyset_pagination
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering=self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(_('Invalid page (%(cursor)s): %(message)s') % {
+                'cursor': self.request.GET.get(self.cursor_kwarg),
+                'message': str(e)
+            })
+        return (paginator, page, page.object_list, page.has_other_pages())
@@ -1,20 +1,139 @@
 """General purpose useful validators"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from dns.exception import DNSException
+from dns.rdatatype import MX
+from dns.resolver import NXDOMAIN, NoAnswer, query
+from idna import IDNAError, encode
 from validate_email import validate_email
 
+DNS_TIMEOUT = 10
+MX_CACHE_KEY = 'validators:mx:{}'
+MX_CACHE_HITS_KEY = 'validators:mx:hits'
+MX_CACHE_MISSES_KEY = 'validators:mx:misses'
+# seconds for which the hits and misses are counted by the process before they are added to the cache
+MX_CACHE_STATS_INTERVAL = 60
+
+_mx_cache_stats = Counter()
+_mx_cache_stats_written_at = time.monotonic()
+_mx_cache_stats_lock = threading.Lock()
 
-def is_email_valid(email):
+
+def is_email_valid(email, check_mx=False):
     """
     Verify whether an email is legit or not.
-    `This feature works only when the Internet connection is alive`.
+    Only the syntax and the blacklisted domains are verified unless `check_mx` is True.
 
     Args
         email: str
             The email to be verified
+        check_mx: bool
+            Whether the domain should have MX records as well, see `has_mx_records`.
+            Unless the domain is cached, it blocks for the DNS resolution, keep it off the request path.
 
     Returns
         bool
     """
-    result = validate_email(email_address=email, check_regex=True, check_mx=True)
+    result = validate_email(email_address=email, check_regex=True, check_mx=False)
     if result is (None or True):
-        return True
+        return not check_mx or has_mx_records(email.rsplit('@', 1)[-1]) is not False
     return False
+
+
+def lookup_mx_records(domain, timeout=DNS_TIMEOUT):
+    """
+    Verify whether the domain has mail servers(MX records) that emails can be delivered to.
+    `This feature works only when the Internet connection is alive`.
+
+    Args
+        domain: str
+        timeout: int
+            Seconds to wait for the DNS resolution.
+
+    Returns
+        bool: True if there are MX records, False if the domain or its MX records don't exist.
+        None: when it can't be determined, e.g. the DNS resolution timed out.
+    """
+    try:
+        answer = query(qname=encode(domain).decode('ascii'), rdtype=MX, lifetime=timeout)
+    except (IDNAError, NXDOMAIN, NoAnswer):
+        return False
+    except DNSException:
+        return None
+    return len(answer) > 0
+
+
+def _increase_counter(key):
+    """Count a hit or a miss in the process, the counts are added to the cache once every `MX_CACHE_STATS_INTERVAL`"""
+    with _mx_cache_stats_lock:
+        _mx_cache_stats[key] += 1
+        if time.monotonic() - _mx_cache_stats_written_at < MX_CACHE_STATS_INTERVAL:
+            return
+    _write_counters()
+
+
+def _write_counters():
+    """Add the hits and misses counted by the process to the counters in the cache"""
+    global _mx_cache_stats, _mx_cache_stats_written_at
+    with _mx_cache_stats_lock:
+        counts, _mx_cache_stats = _mx_cache_stats, Counter()
+        _mx_cache_stats_written_at = time.monotonic()
+
+    for key, count in counts.items():
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # evicted in between
+            cache.set(key, count, timeout=None)
+        else:
+            # incr is a get and a set with the default timeout on some backends(e.g. file and db)
+            cache.touch(key, None)
+
+
+def has_mx_records(domain, timeout=DNS_TIMEOUT):
+    """
+    `lookup_mx_records` with the results cached per domain in the default cache, shared by all workers.
+    Domains with MX records are cached for `EMAIL_DOMAIN_CACHE_TIMEOUT` seconds, those without
+    for `EMAIL_DOMAIN_NEGATIVE_CACHE_TIMEOUT` and undetermined results aren't cached.
+
+    Returns
+        bool or None: same as `lookup_mx_records`.
+    """
+    domain = domain.lower()
+    key = MX_CACHE_KEY.format(domain)
+    result = cache.get(key)
+    if result is not None:
+        _increase_counter(MX_CACHE_HITS_KEY)
+        return result
+
+    _increase_counter(MX_CACHE_MISSES_KEY)
+    result = lookup_mx_records(domain, timeout=timeout)
+    if result:
+        cache.set(key, True, getattr(settings, 'EMAIL_DOMAIN_CACHE_TIMEOUT', 60 * 60 * 24))
+    elif result is False:
+        cache.set(key, False, getattr(settings, 'EMAIL_DOMAIN_NEGATIVE_CACHE_TIMEOUT', 60 * 15))
+    return result
+
+
+def get_mx_cache_stats():
+    """
+    Returns
+        dict: hits, misses and hit rate of the cache of `has_mx_records`, since the counters were reset.
+            Those counted by the other processes are included once they add them to the cache.
+    """
+    _write_counters()
+    hits = cache.get(MX_CACHE_HITS_KEY, 0)
+    misses = cache.get(MX_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
+
+
+def reset_mx_cache_stats():
+    with _mx_cache_stats_lock:
+        _mx_cache_stats.clear()
+    cache.delete_many([MX_CACHE_HITS_KEY, MX_CACHE_MISSES_KEY])